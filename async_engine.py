@@ -0,0 +1,318 @@
+import asyncio
+import ssl
+import threading
+import time
+import zlib
+
+from flow_control import is_overload
+from http_pool import ACCEPT_ENCODING
+from resilience import is_retryable
+from text_segmentation import chunk_text
+from translation_backends import USER_AGENT, GoogleGtxBackend
+from translation_cache import MemoryCache, TieredCache, make_key
+from translation_client import get_client
+
+
+class AsyncTranslationEngine:
+    """Translation engine running on a single asyncio event loop thread
+
+    Requests are multiplexed over a pool of keep-alive connections opened with
+    asyncio streams, so thousands of translations can be in flight without a
+    thread each. Tk frontends use the thread-safe facade: submit() returns a
+    concurrent.futures.Future, translate() blocks for the result.
+
+    By default the engine shares the cache, circuit breaker, retry policy,
+    adaptive concurrency limit and rate limiter of the process-wide
+    TranslationClient, so `max_connections` is only an upper bound. Each
+    attempt, connect included, is bounded by the client's timeout, and
+    retries keep to its retry deadline. Disk cache reads and backends other
+    than the gtx endpoint, which has the only native async transport, run
+    on the loop's default executor.
+    """
+
+    def __init__(self, client=None, max_connections=256):
+        self.client = client or get_client()
+        self.backend = self.client.backend
+        self.native = isinstance(self.backend, GoogleGtxBackend)
+        self.max_connections = max_connections
+        if self.native:
+            pool = self.backend.pool
+            self.scheme = pool.scheme
+            self.host = pool.host
+            self.port = pool.port or (443 if self.scheme == 'https' else 80)
+            self.base_path = pool.base_path
+            self.timeout = pool.timeout
+            self._ssl_context = ssl.create_default_context() if self.scheme == 'https' else None
+
+        self._idle = []
+        self._inflight = {}
+        self._ready = threading.Event()
+
+        self.requests = 0
+        self.connections_opened = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run_loop, daemon=True)
+        self._thread.start()
+        self._ready.wait()
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self._loop)
+        self._slots = asyncio.Semaphore(self.max_connections)
+        self._ready.set()
+        self._loop.run_forever()
+
+    # Thread-safe facade
+
+    def submit(self, text, sl, tl):
+        """Schedule a translation and return a concurrent.futures.Future"""
+        return asyncio.run_coroutine_threadsafe(self.translate_async(text, sl, tl), self._loop)
+
+    def translate(self, text, sl, tl, timeout=None):
+        """Translate text, blocking the calling thread until the result is ready"""
+        return self.submit(text, sl, tl).result(timeout)
+
+    def translate_many(self, texts, sl, tl):
+        """Translate many texts concurrently and return the results in order"""
+        futures = [self.submit(text, sl, tl) for text in texts]
+        return [future.result() for future in futures]
+
+    def close(self):
+        def shutdown():
+            for _, writer in self._idle:
+                writer.close()
+            self._idle = []
+            self._loop.stop()
+        self._loop.call_soon_threadsafe(shutdown)
+        self._thread.join()
+
+    # Coroutines, all running on the engine thread
+
+    async def translate_async(self, text, sl, tl):
+        """Translate text from sl to tl; identical concurrent calls share one request"""
+        if len(text) > self.client.chunk_chars:
+            return await self._translate_long(text, sl, tl)
+
+        cache = self.client.cache
+        if cache is not None:
+            cached = await self._cache_get(cache, sl, tl, text)
+            if cached is not None:
+                return cached
+
+        key = make_key(sl, tl, text)
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch(text, sl, tl))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def _cache_get(self, cache, sl, tl, text):
+        """Look text up without blocking the loop on a SQLite read"""
+        if isinstance(cache, MemoryCache):
+            return cache.get(sl, tl, text)
+        if not isinstance(cache, TieredCache):
+            return await self._loop.run_in_executor(None, cache.get, sl, tl, text)
+        cached = cache.memory.get(sl, tl, text)
+        if cached is None:
+            cached = await self._loop.run_in_executor(None, cache.disk.get, sl, tl, text)
+            if cached is not None:
+                cache.memory.put(sl, tl, text, cached)
+        return cached
+
+    async def _translate_long(self, text, sl, tl):
+        """Translate sentence-aligned chunks concurrently and join them in order"""
+        async def translate_chunk(chunk):
+            body = chunk.strip()
+            if not body:
+                return chunk
+            start = chunk.index(body[0])
+            return chunk[:start] + await self.translate_async(body, sl, tl) + chunk[start + len(body):]
+
+        parts = await asyncio.gather(*(translate_chunk(chunk)
+                                       for chunk in chunk_text(text, self.client.chunk_chars)))
+        return ''.join(parts)
+
+    async def _fetch(self, text, sl, tl):
+        retry = self.client.retry
+        breaker = self.client.breaker
+        start = time.monotonic()
+        for attempt in range(retry.max_attempts):
+            attempt_start = time.monotonic()
+            try:
+                await self._acquire_rate(len(text))
+                breaker.allow()
+                await self._acquire_slot()
+                sent = time.monotonic()
+                try:
+                    translated = await self._fetch_once(text, sl, tl)
+                except Exception as e:
+                    self.client.limiter.release(overloaded=is_overload(e))
+                    breaker.record(not is_retryable(e))
+                    raise
+                self.client.limiter.release(latency=time.monotonic() - sent)
+                breaker.record(True)
+                break
+            except Exception as e:
+                delay = retry.backoff(e, attempt, start, attempt_start)
+                if delay is None:
+                    raise
+                retry.retries += 1
+                await asyncio.sleep(delay)
+
+        if self.client.cache is not None:
+            self.client.cache.put(sl, tl, text, translated)
+        return translated
+
+    async def _acquire_slot(self, poll=0.01):
+        """Wait for a slot of the client's adaptive concurrency limiter"""
+        while not self.client.limiter.try_acquire():
+            await asyncio.sleep(poll)
+
+    async def _acquire_rate(self, chars):
+        rate_limiter = self.client.rate_limiter
+        if rate_limiter is None:
+            return
+        start = None
+        while True:
+            delay = rate_limiter.reserve(chars)
+            if delay == 0:
+                break
+            if start is None:
+                start = time.monotonic()
+            await asyncio.sleep(delay)
+        if start is not None:
+            rate_limiter.record_wait(time.monotonic() - start)
+
+    async def _fetch_once(self, text, sl, tl):
+        if not self.native:
+            async with self._slots:
+                return await self._loop.run_in_executor(
+                    None, self.backend.translate, text, sl, tl)
+
+        path = self.base_path + self.backend.build_path(text, sl, tl)
+        status, body = await self._request(path)
+        return self.backend.parse(status, body)
+
+    async def _open(self):
+        conn = await asyncio.open_connection(self.host, self.port, ssl=self._ssl_context)
+        self.connections_opened += 1
+        return conn
+
+    async def _request(self, path):
+        async with self._slots:
+            self.requests += 1
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            try:
+                return await self._request_on_pooled(path)
+            finally:
+                self.in_flight -= 1
+
+    async def _request_on_pooled(self, path):
+        deadline = time.monotonic() + self.timeout
+        for attempt in range(2):
+            reused = bool(self._idle)
+            if reused:
+                conn = self._idle.pop()
+            else:
+                try:
+                    conn = await asyncio.wait_for(self._open(), deadline - time.monotonic())
+                except asyncio.TimeoutError:
+                    raise TimeoutError("Connecting to the translation service timed out")
+            try:
+                status, body, keep_alive = await asyncio.wait_for(
+                    self._exchange(conn, path), deadline - time.monotonic())
+            except (ConnectionError, asyncio.IncompleteReadError) as e:
+                conn[1].close()
+                # Idle keep-alive connection dropped by the server; retry once
+                if reused and attempt == 0:
+                    continue
+                if isinstance(e, asyncio.IncompleteReadError):
+                    raise ConnectionResetError("Connection closed mid-response") from e
+                raise
+            except asyncio.TimeoutError:
+                conn[1].close()
+                raise TimeoutError("Translation request timed out")
+            except BaseException:
+                conn[1].close()
+                raise
+
+            if keep_alive:
+                self._idle.append(conn)
+            else:
+                conn[1].close()
+            return status, body
+
+    async def _exchange(self, conn, path):
+        """Write one GET request and read the HTTP/1.1 response"""
+        reader, writer = conn
+        host = self.host if self.port in (80, 443) else f"{self.host}:{self.port}"
+        writer.write((f"GET {path} HTTP/1.1\r\n"
+                      f"Host: {host}\r\n"
+                      f"User-Agent: {USER_AGENT}\r\n"
+                      f"Accept-Encoding: {ACCEPT_ENCODING}\r\n"
+                      "Connection: keep-alive\r\n\r\n").encode('ascii'))
+        await writer.drain()
+
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionResetError("Connection closed by server")
+        version, status = status_line.decode('latin-1').split(None, 2)[:2]
+
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        keep_alive = version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+        if headers.get('transfer-encoding', '').lower() == 'chunked':
+            body = await self._read_chunked(reader)
+        elif 'content-length' in headers:
+            body = await reader.readexactly(int(headers['content-length']))
+        else:
+            body = await reader.read()
+            keep_alive = False
+
+        if headers.get('content-encoding', '').lower() in ('gzip', 'deflate'):
+            body = zlib.decompress(body, 32 + zlib.MAX_WBITS)
+        return int(status), body, keep_alive
+
+    @staticmethod
+    async def _read_chunked(reader):
+        chunks = []
+        while True:
+            size = int((await reader.readline()).split(b';')[0].strip(), 16)
+            if size == 0:
+                # Skip trailers up to the blank line
+                while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                    pass
+                return b''.join(chunks)
+            chunks.append(await reader.readexactly(size))
+            await reader.readline()
+
+    def stats(self):
+        return {
+            'requests': self.requests,
+            'connections_opened': self.connections_opened,
+            'in_flight': self.in_flight,
+            'peak_in_flight': self.peak_in_flight
+        }
+
+
+_default_engine = None
+_default_lock = threading.Lock()
+
+
+def get_engine():
+    """Return the process-wide engine, sharing the default client's cache and limits"""
+    global _default_engine
+    with _default_lock:
+        if _default_engine is None:
+            _default_engine = AsyncTranslationEngine()
+        return _default_engine
@@ -2,14 +2,13 @@ import tkinter as tk
 from tkinter import ttk, scrolledtext, messagebox
 import threading
 import time
-import urllib.request
-import urllib.parse
-import json
 import os
 import tempfile
 import subprocess
 import wave
 
+from async_engine import get_engine
+
 # Try to import Windows Speech API
 try:
     import win32com.client
@@ -439,9 +438,8 @@ class AutoVoiceTranslator:
         # Update status
         self.status_label.config(text="🔄 Translating voice input... / හඬ ආදානය පරිවර්තනය කරමින්...")
 
-        # Translate in separate thread
-        threading.Thread(target=self.translate_and_display,
-                        args=(text, input_type), daemon=True).start()
+        # Translate on the shared event loop instead of a thread per request
+        self.translate_and_display(text, input_type)
 
     def toggle_text_mode(self):
         """Toggle text input area"""
@@ -479,70 +477,43 @@ class AutoVoiceTranslator:
             self.text_input.delete(1.0, tk.END)
 
             # Translate
-            threading.Thread(target=self.translate_and_display,
-                           args=(text, "📝 Text"), daemon=True).start()
+            self.translate_and_display(text, "📝 Text")
 
     def translate_and_display(self, text, input_type):
-        """Translate text and display result"""
+        """Submit text to the async engine and display the result when it arrives"""
+        future = get_engine().submit(text, self.input_lang, self.output_lang)
+        future.add_done_callback(
+            lambda f: self.root.after(0, self.display_translation, f))
+
+    def display_translation(self, future):
+        """Display a finished translation (runs on the Tk thread)"""
         try:
-            # Perform translation
-            translated = self.translate_text(text)
+            translated = future.result()
+        except Exception as e:
+            print(f"Translation error: {e}")
+            translated = None
 
+        try:
             if translated:
                 # Display translation
-                self.root.after(0, lambda: self.result_display.insert(
-                    tk.END, f"🌐 Translation ({self.output_lang}): ", "translation"))
-                self.root.after(0, lambda: self.result_display.insert(
-                    tk.END, f"{translated}\n", "translation"))
-                self.root.after(0, lambda: self.result_display.insert(
-                    tk.END, "─" * 80 + "\n", "separator"))
+                self.result_display.insert(
+                    tk.END, f"🌐 Translation ({self.output_lang}): ", "translation")
+                self.result_display.insert(tk.END, f"{translated}\n", "translation")
+                self.result_display.insert(tk.END, "─" * 80 + "\n", "separator")
 
                 # Update status
-                self.root.after(0, lambda: self.status_label.config(
-                    text="✅ Translation completed / පරිවර්තනය සම්පූර්ණයි"))
+                self.status_label.config(
+                    text="✅ Translation completed / පරිවර්තනය සම්පූර්ණයි")
 
             else:
-                self.root.after(0, lambda: self.result_display.insert(
-                    tk.END, "❌ Translation failed / පරිවර්තනය අසාර්ථකයි\n", "error"))
+                self.result_display.insert(
+                    tk.END, "❌ Translation failed / පරිවර්තනය අසාර්ථකයි\n", "error")
 
             # Auto-scroll
-            self.root.after(0, lambda: self.result_display.see(tk.END))
+            self.result_display.see(tk.END)
 
         except Exception as e:
-            self.root.after(0, lambda: self.result_display.insert(
-                tk.END, f"❌ Error: {e}\n", "error"))
-
-    def translate_text(self, text):
-        """Translate text using Google Translate API"""
-        try:
-            base_url = "https://translate.googleapis.com/translate_a/single"
-            params = {
-                'client': 'gtx',
-                'sl': self.input_lang,
-                'tl': self.output_lang,
-                'dt': 't',
-                'q': text
-            }
-
-            url = base_url + '?' + urllib.parse.urlencode(params)
-            headers = {'User-Agent': 'Mozilla/5.0'}
-
-            request = urllib.request.Request(url, headers=headers)
-            response = urllib.request.urlopen(request, timeout=10)
-            result = json.loads(response.read().decode('utf-8'))
-
-            # Extract translated text
-            translated_text = ''
-            if result and len(result) > 0 and result[0]:
-                for sentence in result[0]:
-                    if sentence[0]:
-                        translated_text += sentence[0]
-
-            return translated_text
-
-        except Exception as e:
-            print(f"Translation error: {e}")
-            return None
+            self.result_display.insert(tk.END, f"❌ Error: {e}\n", "error")
 
     def clear_all(self):
         """Clear all displays"""
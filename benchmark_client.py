@@ -0,0 +1,177 @@
+import argparse
+import json
+import sys
+import threading
+import time
+import tracemalloc
+import urllib.parse
+import urllib.request
+
+from async_engine import AsyncTranslationEngine
+from flow_control import AdaptiveConcurrencyLimiter
+from mock_translate_server import start_server
+from translation_cache import MemoryCache
+from translation_backends import extract_translation
+from translation_client import TranslationClient
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows
+    resource = None
+
+
+def translate_urlopen(base_url, text, sl, tl):
+    """The previous per-request urlopen implementation, kept as a baseline"""
+    params = {'client': 'gtx', 'sl': sl, 'tl': tl, 'dt': 't', 'q': text}
+    url = base_url + '/translate_a/single?' + urllib.parse.urlencode(params)
+    request = urllib.request.Request(url, headers={'User-Agent': 'Mozilla/5.0'})
+    response = urllib.request.urlopen(request, timeout=10)
+    return extract_translation(json.loads(response.read().decode('utf-8')))
+
+
+def percentile(samples, fraction):
+    return samples[min(len(samples) - 1, int(fraction * len(samples)))]
+
+
+def run(label, func, count, repeat=False):
+    latencies = []
+    failures = 0
+    start = time.perf_counter()
+    for i in range(count):
+        text = "Where is the bathroom?" if repeat else f"Where is the bathroom? {i}"
+        began = time.perf_counter()
+        try:
+            func(text, 'en', 'si')
+        except Exception:
+            failures += 1
+        latencies.append(time.perf_counter() - began)
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    print(f"{label:<20} {count} requests in {elapsed:.3f}s "
+          f"({elapsed / count * 1000:.2f} ms/request, "
+          f"p50 {percentile(latencies, 0.5) * 1000:.2f} ms, "
+          f"p99 {percentile(latencies, 0.99) * 1000:.2f} ms, {failures} failed)")
+
+
+def resident_memory():
+    """Resident set size of the process in bytes, or None where it cannot be read
+
+    Without /proc this falls back to the peak RSS so far, which only shows
+    growth beyond every earlier run.
+    """
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * resource.getpagesize()
+    except (OSError, AttributeError):
+        pass
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def run_concurrent(label, submit_all, count):
+    """Fire `count` translations at once and report time, peak threads and memory
+
+    tracemalloc only sees Python allocations; thread stacks, the cost of the
+    thread model, show up in the process RSS, sampled while the run lasts.
+    """
+    baseline = resident_memory()
+    peak_rss = [baseline]
+    done = threading.Event()
+
+    def sample():
+        while not done.wait(0.005):
+            peak_rss[0] = max(peak_rss[0], resident_memory())
+
+    if baseline is not None:
+        threading.Thread(target=sample, daemon=True).start()
+    tracemalloc.start()
+    start = time.perf_counter()
+    peak_threads = submit_all([f"Where is the bathroom? {i}" for i in range(count)])
+    elapsed = time.perf_counter() - start
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    done.set()
+    rss = "" if baseline is None else f", peak RSS +{(peak_rss[0] - baseline) / 1024 / 1024:.1f} MB"
+    print(f"{label:<20} {count} requests in {elapsed:.3f}s "
+          f"({count / elapsed:.0f} req/s, peak threads {peak_threads}, "
+          f"peak Python memory {peak_memory / 1024 / 1024:.1f} MB{rss})")
+
+
+def thread_per_request(client):
+    def work(text):
+        try:
+            client.translate(text, 'en', 'si')
+        except Exception as e:
+            print(f"Translation error: {e}")
+
+    def submit_all(texts):
+        threads = [threading.Thread(target=work, args=(text,)) for text in texts]
+        for thread in threads:
+            thread.start()
+        peak = threading.active_count()
+        for thread in threads:
+            thread.join()
+        return peak
+    return submit_all
+
+
+def event_loop(engine):
+    def submit_all(texts):
+        futures = [engine.submit(text, 'en', 'si') for text in texts]
+        peak = threading.active_count()
+        for future in futures:
+            try:
+                future.result()
+            except Exception as e:
+                print(f"Translation error: {e}")
+        return peak
+    return submit_all
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark translation clients against a local mock server")
+    parser.add_argument('--count', type=int, default=500)
+    parser.add_argument('--concurrent', type=int, default=500,
+                        help="requests fired at once for the thread vs asyncio comparison")
+    parser.add_argument('--latency', type=float, default=0.05,
+                        help="mock server response delay for the concurrency comparison")
+    parser.add_argument('--jitter', type=float, default=0.0,
+                        help="extra random mock latency for the sequential runs")
+    parser.add_argument('--error-rate', type=float, default=0.0,
+                        help="fraction of mock responses that fail with 503")
+    parser.add_argument('--seed', type=int, default=1, help="mock server random seed")
+    parser.add_argument('--base-url', help="use an already running server instead of the bundled mock")
+    args = parser.parse_args()
+
+    base_url = args.base_url
+    if not base_url:
+        _, base_url = start_server(jitter=args.jitter, error_rate=args.error_rate, seed=args.seed)
+
+    run("urlopen", lambda t, sl, tl: translate_urlopen(base_url, t, sl, tl), args.count)
+
+    client = TranslationClient(base_url)
+    run("pooled keep-alive", client.translate, args.count)
+    print(f"pooled connections opened: {client.pool.connections_opened}")
+
+    cached = TranslationClient(base_url, cache=MemoryCache())
+    run("memory cache", cached.translate, args.count, repeat=True)
+    print(f"cache stats: {cached.cache.stats()}")
+
+    slow_url = args.base_url
+    if not slow_url:
+        _, slow_url = start_server(latency=args.latency, seed=args.seed)
+    # Both models get the same fixed concurrency limit, each its own instance
+    wide = AdaptiveConcurrencyLimiter(initial_limit=256, max_limit=256)
+    run_concurrent("thread per request",
+                   thread_per_request(TranslationClient(slow_url, limiter=wide)), args.concurrent)
+    wide = AdaptiveConcurrencyLimiter(initial_limit=256, max_limit=256)
+    engine = AsyncTranslationEngine(TranslationClient(slow_url, limiter=wide), max_connections=256)
+    run_concurrent("asyncio engine", event_loop(engine), args.concurrent)
+    print(f"engine stats: {engine.stats()}")
+
+
+if __name__ == "__main__":
+    main()
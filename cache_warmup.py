@@ -0,0 +1,102 @@
+import threading
+
+from flow_control import RateLimitedError
+
+
+class CacheWarmer:
+    """Fills the translation cache in the background while the app is idle
+
+    It first warms the most frequent inputs of earlier sessions (promoting
+    persistent cache hits into memory), then the given phrases for the
+    current language pair; route(phrase), if given, picks each phrase's
+    (sl, tl) the way the app would when the phrase is used. Phrases found in an optional phrasebook are
+    cached without a request. Network fetches never wait for rate-limit
+    budget and only go out while no interactive request is in flight, so
+    the warmer always yields to the user. stop() ends it for good;
+    on_done(warmed) is called from the worker thread when it finishes.
+    """
+
+    def __init__(self, client, sl, tl, phrases=(), phrasebook=None,
+                 frequent_limit=50, idle_poll=0.2, on_done=None, route=None):
+        self.client = client
+        self.sl = sl
+        self.tl = tl
+        self.phrases = list(phrases)
+        self.route = route
+        self.phrasebook = phrasebook
+        self.frequent_limit = frequent_limit
+        self.idle_poll = idle_poll
+        self.on_done = on_done
+
+        self._stopped = threading.Event()
+        self._thread = None
+
+        self.warmed = 0
+        self.skipped = 0
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopped.set()
+
+    @property
+    def stopped(self):
+        return self._stopped.is_set()
+
+    def _wait_idle(self):
+        """Wait until no interactive request is in flight; False once stopped"""
+        while not self.stopped:
+            if self.client.limiter.stats()['in_flight'] == 0:
+                return True
+            self._stopped.wait(self.idle_poll)
+        return False
+
+    def _run(self):
+        try:
+            cache = self.client.cache
+            if cache is None:
+                return
+            work = [(sl, tl, source) for sl, tl, source, _ in cache.frequent(self.frequent_limit)]
+            route = self.route or (lambda phrase: (self.sl, self.tl))
+            work += [(*route(phrase), phrase) for phrase in self.phrases]
+            for sl, tl, text in work:
+                if self.stopped:
+                    return
+                self._warm(cache, sl, tl, text)
+        finally:
+            if self.on_done is not None:
+                self.on_done(self.warmed)
+
+    def _warm(self, cache, sl, tl, text):
+        # A get also promotes a disk hit into memory
+        if cache.get(sl, tl, text) is not None:
+            self.warmed += 1
+            return
+        if self.phrasebook is not None:
+            translated = self.phrasebook.lookup(text, tl, sl)
+            if translated is not None:
+                cache.put(sl, tl, text, translated)
+                self.warmed += 1
+                return
+
+        while self._wait_idle():
+            try:
+                translated = self.client.fetch(text, sl, tl, wait=False)
+            except RateLimitedError:
+                # Leave the budget to interactive requests and try again later
+                self._stopped.wait(self.idle_poll)
+                continue
+            except Exception:
+                # The service is struggling; do not add to its load
+                self.skipped += 1
+                self.stop()
+                return
+            cache.put(sl, tl, text, translated)
+            self.warmed += 1
+            return
+
+    def stats(self):
+        return {'warmed': self.warmed, 'skipped': self.skipped, 'stopped': self.stopped}
@@ -2,13 +2,86 @@ import tkinter as tk
 from tkinter import ttk, scrolledtext, messagebox
 import threading
 import time
-import urllib.request
-import urllib.parse
-import json
 import subprocess
 import os
 import tempfile
 
+from cache_warmup import CacheWarmer
+from language_detection import DirectionRouter
+from phrasebook import Phrasebook, catalog_phrases
+from translation_client import get_client, translate
+from transliteration import LiveTransliteration
+
+# Languages offered in the input and output combos
+LANGUAGES = [
+    ('English', 'en'),
+    ('Sinhala (සිංහල)', 'si'),
+    ('Tamil (தமிழ்)', 'ta'),
+    ('Hindi (हिन्दी)', 'hi'),
+    ('Spanish', 'es'),
+    ('French', 'fr'),
+    ('German', 'de'),
+    ('Japanese', 'ja'),
+    ('Korean', 'ko'),
+    ('Chinese', 'zh-CN')
+]
+
+# Phrase catalogs; phrasebook.py precompiles them into every language above
+QUICK_PHRASES = {
+    "Greetings / ආයුබෝවන": [
+        "Hello", "Good morning", "Good evening", "How are you?",
+        "Nice to meet you", "Goodbye", "See you later", "Thank you"
+    ],
+    "Travel / ගමන": [
+        "Where is the bathroom?", "How much does this cost?",
+        "I need help", "Do you speak English?", "Where is the hotel?",
+        "Can you help me?", "I'm lost", "Call a taxi"
+    ],
+    "Food / ආහාර": [
+        "I'm hungry", "This is delicious", "The bill please",
+        "Water please", "I'm vegetarian", "What do you recommend?",
+        "No spicy food", "Can I have the menu?"
+    ]
+}
+
+VOICE_COMMANDS = {
+    "Basic Commands / මූලික විධාන": [
+        "What time is it?", "What is your name?", "How old are you?",
+        "Where are you from?", "What is this?", "How do you say this?",
+        "I don't understand", "Please repeat"
+    ],
+    "Emergency / හදිසි": [
+        "Help me", "Call the police", "I need a doctor",
+        "Emergency", "Fire", "Call ambulance", "I'm sick", "Hospital"
+    ],
+    "Directions / දිශාව": [
+        "Where is?", "How do I get to?", "Turn left", "Turn right",
+        "Go straight", "Stop here", "Near", "Far"
+    ]
+}
+
+SAMPLE_TEXTS = {
+    "Business / ව්‍යාපාර": [
+        "I would like to schedule a meeting",
+        "Please send me the report",
+        "The project is completed",
+        "We need to discuss the budget"
+    ],
+    "Education / අධ්‍යාපන": [
+        "I need help with my homework",
+        "When is the exam?",
+        "Can you explain this concept?",
+        "The assignment is due tomorrow"
+    ],
+    "Daily Life / දෛනික ජීවිතය": [
+        "What's the weather like?",
+        "I'm going to the store",
+        "Let's have dinner together",
+        "I'll call you later"
+    ]
+}
+
+
 class FinalVoiceTranslator:
     def __init__(self, root):
         self.root = root
@@ -19,7 +92,16 @@ class FinalVoiceTranslator:
         self.input_lang = 'en'
         self.output_lang = 'si'
 
+        # Catalog phrases precompiled by phrasebook.py answer clicks offline
+        self.phrasebook = Phrasebook.load()
+
         self.setup_ui()
+        self.update_languages()
+
+        # Warm the cache once the window is up; typing or speaking stops it
+        self.warmer = None
+        self.warmup_stopped = False
+        self.root.after(1000, self.start_warmup)
 
     def setup_ui(self):
         # Main container
@@ -47,21 +129,8 @@ class FinalVoiceTranslator:
                                   bg='#ffffff', fg='#1f2937', padx=15, pady=10)
         lang_frame.pack(fill=tk.X, pady=(0, 15))
 
-        languages = [
-            ('English', 'en'),
-            ('Sinhala (සිංහල)', 'si'),
-            ('Tamil (தமிழ்)', 'ta'),
-            ('Hindi (हिन्दी)', 'hi'),
-            ('Spanish', 'es'),
-            ('French', 'fr'),
-            ('German', 'de'),
-            ('Japanese', 'ja'),
-            ('Korean', 'ko'),
-            ('Chinese', 'zh-CN')
-        ]
-
-        self.lang_dict = {name: code for name, code in languages}
-        lang_names = [name for name, code in languages]
+        self.lang_dict = {name: code for name, code in LANGUAGES}
+        lang_names = [name for name, code in LANGUAGES]
 
         lang_controls = tk.Frame(lang_frame, bg='#ffffff')
         lang_controls.pack(fill=tk.X, pady=5)
@@ -148,6 +217,8 @@ class FinalVoiceTranslator:
                                  wrap=tk.WORD, bg='#f9fafb', relief='flat',
                                  bd=1, padx=8, pady=8)
         self.text_input.pack(fill=tk.BOTH, expand=True)
+        self.text_input.bind('<Key>', self.stop_warmup)
+        self.singlish = LiveTransliteration(self.text_input, enabled=False)
 
         text_controls = tk.Frame(self.text_input_frame, bg='#ffffff')
         text_controls.pack(fill=tk.X, padx=10, pady=(0, 10))
@@ -160,6 +231,12 @@ class FinalVoiceTranslator:
                  font=('Segoe UI', 10), bg='#6b7280', fg='white',
                  relief='flat', padx=12, pady=6, cursor='hand2').pack(side=tk.LEFT, padx=3)
 
+        # Singlish typed here turns into Sinhala script as you type
+        self.singlish_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(text_controls, text="Singlish → සිංහල", variable=self.singlish_var,
+                      command=self.toggle_singlish, font=('Segoe UI', 10),
+                      bg='#ffffff').pack(side=tk.RIGHT, padx=3)
+
         # Results display
         result_frame = tk.LabelFrame(main_container,
                                     text=" 🔄 Translation Results / පරිවර්තන ප්‍රතිඵල ",
@@ -216,6 +293,9 @@ class FinalVoiceTranslator:
         output_selection = self.output_combo.get()
         self.input_lang = self.lang_dict.get(input_selection, 'en')
         self.output_lang = self.lang_dict.get(output_selection, 'si')
+        # Each utterance is routed by its detected language, so speaking the
+        # target language translates back the other way
+        self.router = DirectionRouter(self.input_lang, self.output_lang, self.lang_dict.values())
 
     def swap_languages(self):
         input_val = self.input_combo.get()
@@ -225,6 +305,27 @@ class FinalVoiceTranslator:
         self.update_languages()
         self.add_message("⇄ Languages swapped / භාෂා අදලාවෙනු කරන ලදි", "success")
 
+    def start_warmup(self):
+        """Pre-translate frequent inputs and the phrase catalogs in the background"""
+        if self.warmup_stopped:
+            # The user got going before the window was idle
+            return
+        phrases = catalog_phrases(QUICK_PHRASES, VOICE_COMMANDS, SAMPLE_TEXTS)
+        # Catalog phrases are English; route them as a click on one would be
+        self.warmer = CacheWarmer(get_client(), self.input_lang, self.output_lang, phrases,
+                                  phrasebook=self.phrasebook, route=self.router.route,
+                                  on_done=lambda warmed: self.root.after(0, self.warmup_done, warmed))
+        self.warmer.start()
+
+    def stop_warmup(self, event=None):
+        self.warmup_stopped = True
+        if self.warmer is not None:
+            self.warmer.stop()
+
+    def warmup_done(self, warmed):
+        if warmed:
+            self.add_message(f"🔥 Warmed {warmed} translations / පරිවර්තන {warmed}ක් සූදානම්", "success")
+
     def phone_recording_guide(self):
         """Guide for recording with phone"""
         guide_window = tk.Toplevel(self.root)
@@ -281,6 +382,7 @@ class FinalVoiceTranslator:
     def start_phone_recording(self, guide_window):
         """Start phone recording process"""
         guide_window.destroy()
+        self.stop_warmup()
 
         # Show countdown
         countdown_window = tk.Toplevel(self.root)
@@ -318,6 +420,7 @@ class FinalVoiceTranslator:
 
     def manual_voice_input(self):
         """Manual voice input"""
+        self.stop_warmup()
         voice_text = tk.simpledialog.askstring(
             "Voice Input",
             "🗣️ What did you say?\n"
@@ -330,44 +433,11 @@ class FinalVoiceTranslator:
 
     def show_quick_phrases(self):
         """Show quick phrases"""
-        phrases = {
-            "Greetings / ආයුබෝවන": [
-                "Hello", "Good morning", "Good evening", "How are you?",
-                "Nice to meet you", "Goodbye", "See you later", "Thank you"
-            ],
-            "Travel / ගමන": [
-                "Where is the bathroom?", "How much does this cost?",
-                "I need help", "Do you speak English?", "Where is the hotel?",
-                "Can you help me?", "I'm lost", "Call a taxi"
-            ],
-            "Food / ආහාර": [
-                "I'm hungry", "This is delicious", "The bill please",
-                "Water please", "I'm vegetarian", "What do you recommend?",
-                "No spicy food", "Can I have the menu?"
-            ]
-        }
-
-        self.show_phrase_window("⚡ Quick Phrases", phrases)
+        self.show_phrase_window("⚡ Quick Phrases", QUICK_PHRASES)
 
     def show_voice_commands(self):
         """Show voice commands"""
-        commands = {
-            "Basic Commands / මූලික විධාන": [
-                "What time is it?", "What is your name?", "How old are you?",
-                "Where are you from?", "What is this?", "How do you say this?",
-                "I don't understand", "Please repeat"
-            ],
-            "Emergency / හදිසි": [
-                "Help me", "Call the police", "I need a doctor",
-                "Emergency", "Fire", "Call ambulance", "I'm sick", "Hospital"
-            ],
-            "Directions / දිශාව": [
-                "Where is?", "How do I get to?", "Turn left", "Turn right",
-                "Go straight", "Stop here", "Near", "Far"
-            ]
-        }
-
-        self.show_phrase_window("🎯 Voice Commands", commands)
+        self.show_phrase_window("🎯 Voice Commands", VOICE_COMMANDS)
 
     def show_phrase_window(self, title, phrases_dict):
         """Show phrase selection window"""
@@ -407,32 +477,18 @@ class FinalVoiceTranslator:
     def select_phrase(self, phrase, window):
         """Select a phrase"""
         window.destroy()
-        self.process_voice_input(phrase, "⚡ Quick Phrase")
+        sl, tl = self.router.route(phrase)
+        translated = self.phrasebook.lookup(phrase, tl, sl)
+        if translated is None:
+            self.process_voice_input(phrase, "⚡ Quick Phrase")
+            return
+        self.add_message(f"⚡ Quick Phrase: {phrase}", "voice")
+        self.add_message(f"🌐 Translation: {translated}", "translation")
+        self.status_label.config(text="✅ Complete / සම්පූර්ණයි")
 
     def show_sample_texts(self):
         """Show sample texts"""
-        samples = {
-            "Business / ව්‍යාපාර": [
-                "I would like to schedule a meeting",
-                "Please send me the report",
-                "The project is completed",
-                "We need to discuss the budget"
-            ],
-            "Education / අධ්‍යාපන": [
-                "I need help with my homework",
-                "When is the exam?",
-                "Can you explain this concept?",
-                "The assignment is due tomorrow"
-            ],
-            "Daily Life / දෛනික ජීවිතය": [
-                "What's the weather like?",
-                "I'm going to the store",
-                "Let's have dinner together",
-                "I'll call you later"
-            ]
-        }
-
-        self.show_phrase_window("🔤 Sample Texts", samples)
+        self.show_phrase_window("🔤 Sample Texts", SAMPLE_TEXTS)
 
     def process_voice_input(self, text, input_type):
         """Process voice input"""
@@ -454,6 +510,10 @@ class FinalVoiceTranslator:
                 self.text_input_frame.pack(fill=tk.X, pady=10)
             self.text_input.focus()
 
+    def toggle_singlish(self):
+        self.singlish.enabled = self.singlish_var.get()
+        self.singlish.reset()
+
     def translate_text_input(self):
         """Translate text input"""
         text = self.text_input.get(1.0, tk.END).strip()
@@ -490,19 +550,7 @@ class FinalVoiceTranslator:
     def translate_text(self, text):
         """Translate using Google Translate"""
         try:
-            base_url = "https://translate.googleapis.com/translate_a/single"
-            params = {'client': 'gtx', 'sl': self.input_lang, 'tl': self.output_lang, 'dt': 't', 'q': text}
-            url = base_url + '?' + urllib.parse.urlencode(params)
-            request = urllib.request.Request(url, headers={'User-Agent': 'Mozilla/5.0'})
-            response = urllib.request.urlopen(request, timeout=10)
-            result = json.loads(response.read().decode('utf-8'))
-
-            translated_text = ''
-            if result and len(result) > 0 and result[0]:
-                for sentence in result[0]:
-                    if sentence[0]:
-                        translated_text += sentence[0]
-            return translated_text
+            return translate(text, *self.router.route(text))
         except Exception as e:
             print(f"Translation error: {e}")
             return None
@@ -0,0 +1,389 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+
+def is_overload(error):
+    """Return True for errors that mean the endpoint is saturated or throttling us"""
+    status = getattr(error, 'status', None)
+    if status is not None:
+        return status in (429, 503)
+    return isinstance(error, TimeoutError)
+
+
+class AdaptiveConcurrencyLimiter:
+    """AIMD limit on concurrent outbound requests
+
+    Each success while latency stays near the observed baseline grows the
+    limit additively (about +1 per `limit` completions). Latency well above
+    the baseline backs off gently, but only while every slot is taken: a
+    slow answer with slots to spare is a large payload or jitter, not
+    congestion. 429/503 responses and timeouts halve the limit. Callers over
+    the limit wait in line instead of hitting the endpoint.
+    """
+
+    def __init__(self, initial_limit=4, min_limit=1, max_limit=32,
+                 latency_tolerance=2.0, backoff=0.5):
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_tolerance = latency_tolerance
+        self.backoff = backoff
+
+        self.baseline = None
+        self._inflight = 0
+        self._waiting = 0
+        self._cond = threading.Condition()
+
+        self.queued = 0
+        self.decreases = 0
+
+    def _acquire(self):
+        with self._cond:
+            if self._inflight >= int(self.limit):
+                self.queued += 1
+                self._waiting += 1
+                while self._inflight >= int(self.limit):
+                    self._cond.wait()
+                self._waiting -= 1
+            self._inflight += 1
+
+    def try_acquire(self):
+        """Take a slot without waiting; return False while the limit is reached"""
+        with self._cond:
+            if self._inflight >= int(self.limit):
+                return False
+            self._inflight += 1
+            return True
+
+    def release(self, latency=None, overloaded=False):
+        """Give a slot back and adapt the limit to how the request went"""
+        with self._cond:
+            saturated = self._inflight >= int(self.limit)
+            self._inflight -= 1
+            if overloaded:
+                self.limit = max(self.min_limit, self.limit * self.backoff)
+                self.decreases += 1
+            elif latency is not None:
+                if self.baseline is None or latency < self.baseline:
+                    self.baseline = latency
+                else:
+                    # Drift slowly upwards so a permanently slower route
+                    # does not look like congestion forever
+                    self.baseline += (latency - self.baseline) * 0.01
+
+                if latency > self.baseline * self.latency_tolerance:
+                    if saturated:
+                        self.limit = max(self.min_limit, self.limit * 0.9)
+                        self.decreases += 1
+                else:
+                    self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+            self._cond.notify_all()
+
+    def call(self, func):
+        self._acquire()
+        start = time.monotonic()
+        try:
+            result = func()
+        except Exception as e:
+            self.release(overloaded=is_overload(e))
+            raise
+        self.release(latency=time.monotonic() - start)
+        return result
+
+    def stats(self):
+        with self._cond:
+            return {
+                'limit': round(self.limit, 2),
+                'in_flight': self._inflight,
+                'waiting': self._waiting,
+                'queued': self.queued,
+                'decreases': self.decreases,
+                'baseline_ms': round(self.baseline * 1000, 1) if self.baseline else None
+            }
+
+
+class RateLimitedError(Exception):
+    """Raised by a non-blocking acquire when the rate limit has no budget left"""
+
+
+class TokenBucket:
+    """Refills `rate` tokens per second up to `capacity`"""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity or rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay_for(self, amount):
+        """Seconds until `amount` tokens are available (0 if they are now)"""
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def take(self, amount):
+        self.tokens -= min(amount, self.capacity)
+
+
+class RateLimiter:
+    """Process-wide token-bucket limit on requests per second and characters per second"""
+
+    def __init__(self, requests_per_second=10, chars_per_second=10000,
+                 request_burst=None, char_burst=None):
+        self.requests = TokenBucket(requests_per_second, request_burst or requests_per_second * 2)
+        self.chars = TokenBucket(chars_per_second, char_burst or chars_per_second * 2)
+        self._lock = threading.Lock()
+
+        self.acquired = 0
+        self.rejected = 0
+        self.waits = 0
+        self.wait_seconds = 0.0
+        self.max_wait = 0.0
+
+    def reserve(self, chars=0):
+        """Take budget if available and return 0, otherwise return seconds to wait"""
+        with self._lock:
+            now = time.monotonic()
+            self.requests.refill(now)
+            self.chars.refill(now)
+            delay = max(self.requests.delay_for(1), self.chars.delay_for(chars))
+            if delay == 0:
+                self.requests.take(1)
+                self.chars.take(chars)
+                self.acquired += 1
+            return delay
+
+    def try_acquire(self, chars=0):
+        """Take budget for one request without waiting; False if there is none"""
+        if self.reserve(chars) == 0:
+            return True
+        with self._lock:
+            self.rejected += 1
+        return False
+
+    def acquire(self, chars=0):
+        """Block until budget for one request of `chars` characters is available"""
+        start = None
+        while True:
+            delay = self.reserve(chars)
+            if delay == 0:
+                break
+            if start is None:
+                start = time.monotonic()
+            time.sleep(delay)
+
+        if start is not None:
+            self.record_wait(time.monotonic() - start)
+
+    def record_wait(self, waited):
+        with self._lock:
+            self.waits += 1
+            self.wait_seconds += waited
+            self.max_wait = max(self.max_wait, waited)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'acquired': self.acquired,
+                'rejected': self.rejected,
+                'waits': self.waits,
+                'wait_seconds': round(self.wait_seconds, 3),
+                'max_wait': round(self.max_wait, 3)
+            }
+
+
+class LatencyTracker:
+    """Sliding window of recent request latencies"""
+
+    def __init__(self, window=200):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, latency):
+        with self._lock:
+            self._samples.append(latency)
+
+    def __len__(self):
+        return len(self._samples)
+
+    def percentile(self, fraction):
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return None
+        return samples[min(len(samples) - 1, int(fraction * len(samples)))]
+
+
+class HedgingPolicy:
+    """Sends a duplicate request when the first one is slower than the observed p95
+
+    run() calls func(handle) on a worker thread. If it has not finished by the
+    p95 of recent latencies (once `min_samples` have been seen) and hedges so
+    far are below `max_fraction` of requests, a second copy is started. The
+    first successful result wins and the loser's socket is aborted through its
+    handle. A hedge is a request of its own: admit(), if given, is asked
+    first and returns the function to run as the hedge once it has taken the
+    budget it needs, or None to go without one.
+    """
+
+    def __init__(self, handle_factory, percentile=0.95, max_fraction=0.05,
+                 min_samples=20, max_workers=64):
+        self.handle_factory = handle_factory
+        self.percentile = percentile
+        self.max_fraction = max_fraction
+        self.min_samples = min_samples
+        self.latencies = LatencyTracker()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix='hedge')
+        self._lock = threading.Lock()
+
+        self.requests = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.rejected = 0
+
+    def hedge_delay(self):
+        if len(self.latencies) < self.min_samples:
+            return None
+        return self.latencies.percentile(self.percentile)
+
+    def _take_budget(self):
+        with self._lock:
+            if self.hedges + 1 > self.max_fraction * self.requests:
+                return False
+            self.hedges += 1
+            return True
+
+    def run(self, func, admit=None):
+        with self._lock:
+            self.requests += 1
+        start = time.monotonic()
+        delay = self.hedge_delay()
+        if delay is None:
+            result = func(self.handle_factory())
+            self.latencies.record(time.monotonic() - start)
+            return result
+
+        primary_handle = self.handle_factory()
+        primary = self._executor.submit(func, primary_handle)
+        done, _ = wait([primary], timeout=delay)
+        hedge_func = None
+        if not done and self._take_budget():
+            hedge_func = admit() if admit is not None else func
+            if hedge_func is None:
+                with self._lock:
+                    self.hedges -= 1
+                    self.rejected += 1
+        if hedge_func is None:
+            result = primary.result()
+            self.latencies.record(time.monotonic() - start)
+            return result
+
+        hedge_handle = self.handle_factory()
+        hedge = self._executor.submit(hedge_func, hedge_handle)
+        attempts = {primary: primary_handle, hedge: hedge_handle}
+        pending = set(attempts)
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is not None:
+                    error = future.exception()
+                    continue
+                for loser in pending:
+                    attempts[loser].abort()
+                if future is hedge:
+                    with self._lock:
+                        self.hedge_wins += 1
+                self.latencies.record(time.monotonic() - start)
+                return future.result()
+        raise error
+
+    def stats(self):
+        with self._lock:
+            return {
+                'requests': self.requests,
+                'hedges': self.hedges,
+                'hedge_wins': self.hedge_wins,
+                'rejected': self.rejected,
+                'hedge_rate': self.hedges / self.requests if self.requests else 0.0,
+                'win_rate': self.hedge_wins / self.hedges if self.hedges else 0.0,
+                'hedge_delay_ms': round(self.hedge_delay() * 1000, 1) if self.hedge_delay() else None
+            }
+
+
+class AdaptiveDebouncer:
+    """Chooses how long to wait after a keystroke before translating
+
+    The delay tracks the p90 of recent gaps between keystrokes (gaps over
+    `pause` seconds are pauses, not typing), so bursty typing waits until
+    the burst is over. It is capped at a few round trips of the measured
+    translation latency: on a fast network a slow typist sees results
+    between words, since an early request costs little. A request is wasted
+    if another one fires before its result is shown.
+    """
+
+    def __init__(self, initial_delay=0.8, min_delay=0.15, max_delay=1.5,
+                 pause=2.0, rtt_factor=3.0, window=50):
+        self.initial_delay = initial_delay
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.pause = pause
+        self.rtt_factor = rtt_factor
+        self.gaps = LatencyTracker(window)
+        self.rtts = LatencyTracker(window)
+        self._last_key = None
+        self._lock = threading.Lock()
+
+        self.requests = 0
+        self.wasted = 0
+
+    def keystroke(self):
+        now = time.monotonic()
+        with self._lock:
+            last, self._last_key = self._last_key, now
+        if last is not None and now - last < self.pause:
+            self.gaps.record(now - last)
+
+    def delay(self):
+        """Seconds to wait after the latest keystroke"""
+        if len(self.gaps) < 5:
+            return self.initial_delay
+        delay = self.gaps.percentile(0.9) * 1.2
+        rtt = self.rtts.percentile(0.5)
+        if rtt is not None:
+            delay = min(delay, self.rtt_factor * rtt + 0.2)
+        return max(self.min_delay, min(self.max_delay, delay))
+
+    def fire(self):
+        """Count a debounced request and return its number"""
+        with self._lock:
+            self.requests += 1
+            return self.requests
+
+    def completed(self, request, rtt=None):
+        """Record the outcome of request `request`; rtt is None if it failed or was cancelled"""
+        with self._lock:
+            if request != self.requests:
+                self.wasted += 1
+        if rtt is not None:
+            self.rtts.record(rtt)
+
+    def stats(self):
+        with self._lock:
+            requests, wasted = self.requests, self.wasted
+        rtt = self.rtts.percentile(0.5)
+        return {
+            'delay_ms': round(self.delay() * 1000),
+            'rtt_ms': round(rtt * 1000) if rtt is not None else None,
+            'requests': requests,
+            'wasted': wasted,
+            'wasted_ratio': wasted / requests if requests else 0.0
+        }
@@ -0,0 +1,208 @@
+import http.client
+import socket
+import threading
+import urllib.parse
+import zlib
+from concurrent.futures import CancelledError
+
+ACCEPT_ENCODING = 'gzip, deflate'
+READ_SIZE = 16384
+
+
+class RequestHandle:
+    """Lets another thread abort a request that is blocked on its socket"""
+
+    def __init__(self):
+        self.conn = None
+        self.aborted = False
+        self._lock = threading.Lock()
+
+    def attach(self, conn):
+        with self._lock:
+            self.conn = conn
+            if self.aborted:
+                self._shutdown()
+
+    def detach(self):
+        """Forget the connection once its request is done; True if aborted meanwhile"""
+        with self._lock:
+            self.conn = None
+            return self.aborted
+
+    def abort(self):
+        with self._lock:
+            self.aborted = True
+            if self.conn is not None:
+                self._shutdown()
+
+    def _shutdown(self):
+        try:
+            self.conn.sock.shutdown(socket.SHUT_RDWR)
+        except (OSError, AttributeError):
+            # Not connected yet or already closed
+            pass
+
+
+class CancellationToken:
+    """Cancels every request started under it, aborting sockets already in flight"""
+
+    def __init__(self):
+        self.cancelled = False
+        self._handles = set()
+        self._lock = threading.Lock()
+
+    def handle(self):
+        """Return a RequestHandle that is aborted when the token is cancelled"""
+        handle = RequestHandle()
+        with self._lock:
+            if self.cancelled:
+                handle.abort()
+            else:
+                self._handles.add(handle)
+        return handle
+
+    def release(self, handle):
+        with self._lock:
+            self._handles.discard(handle)
+
+    def check(self):
+        """Raise CancelledError if the token has been cancelled"""
+        if self.cancelled:
+            raise CancelledError()
+
+    def cancel(self):
+        with self._lock:
+            self.cancelled = True
+            handles = list(self._handles)
+            self._handles.clear()
+        for handle in handles:
+            handle.abort()
+
+
+class ConnectionPool:
+    """Thread-safe pool of persistent HTTP/1.1 keep-alive connections to one host"""
+
+    def __init__(self, base_url, max_idle=8, timeout=10):
+        parsed = urllib.parse.urlsplit(base_url)
+        self.scheme = parsed.scheme or 'https'
+        self.host = parsed.hostname
+        self.port = parsed.port
+        self.base_path = parsed.path.rstrip('/')
+        self.max_idle = max_idle
+        self.timeout = timeout
+
+        self._idle = []
+        self._lock = threading.Lock()
+        self.connections_opened = 0
+        self.bytes_received = 0
+        self.bytes_decoded = 0
+
+    def _new_connection(self):
+        if self.scheme == 'https':
+            conn = http.client.HTTPSConnection(self.host, self.port, timeout=self.timeout)
+        else:
+            conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        with self._lock:
+            self.connections_opened += 1
+        return conn
+
+    def _acquire(self):
+        with self._lock:
+            if self._idle:
+                return self._idle.pop(), True
+        return self._new_connection(), False
+
+    def _release(self, conn):
+        with self._lock:
+            if len(self._idle) < self.max_idle:
+                self._idle.append(conn)
+                return
+        conn.close()
+
+    def _read_body(self, response, on_data):
+        """Read and decompress the response body, passing decoded chunks to on_data"""
+        encoding = (response.getheader('Content-Encoding') or '').lower()
+        # 32 + MAX_WBITS accepts both gzip and zlib-wrapped deflate
+        decoder = zlib.decompressobj(32 + zlib.MAX_WBITS) if encoding in ('gzip', 'deflate') else None
+
+        parts = []
+        received = 0
+        while True:
+            chunk = response.read1(READ_SIZE)
+            if not chunk:
+                # read1() can stop at the end of a Content-Length body without
+                # finishing the response, which would leave the connection
+                # unusable for the next request; read() completes it
+                chunk = response.read()
+                if not chunk:
+                    break
+            received += len(chunk)
+            if decoder is not None:
+                chunk = decoder.decompress(chunk)
+            if chunk:
+                parts.append(chunk)
+                if on_data is not None:
+                    on_data(chunk)
+        if decoder is not None:
+            tail = decoder.flush()
+            if tail:
+                parts.append(tail)
+                if on_data is not None:
+                    on_data(tail)
+
+        data = b''.join(parts)
+        with self._lock:
+            self.bytes_received += received
+            self.bytes_decoded += len(data)
+        return data
+
+    def request(self, method, path, headers=None, body=None, handle=None, on_data=None):
+        """Send a request over a pooled connection and return (status, headers, body)
+
+        Responses are requested compressed and decompressed as they stream in;
+        on_data, if given, receives each decoded chunk of a 200 response as it
+        arrives. If a
+        RequestHandle is given, aborting it from another thread shuts the
+        socket down and makes this call raise.
+        """
+        headers = dict(headers or {})
+        headers.setdefault('Connection', 'keep-alive')
+        headers.setdefault('Accept-Encoding', ACCEPT_ENCODING)
+
+        for attempt in range(2):
+            conn, reused = self._acquire()
+            if handle is not None:
+                if handle.aborted:
+                    self._release(conn)
+                    raise ConnectionAbortedError("Request aborted")
+                handle.attach(conn)
+            try:
+                conn.request(method, self.base_path + path, body=body, headers=headers)
+                response = conn.getresponse()
+                data = self._read_body(response, on_data if response.status == 200 else None)
+            except (ConnectionError, http.client.BadStatusLine):
+                conn.close()
+                # The server may have dropped an idle keep-alive connection;
+                # retry once on a fresh socket before giving up.
+                if reused and attempt == 0 and not (handle and handle.aborted):
+                    continue
+                raise
+            except Exception:
+                conn.close()
+                raise
+
+            # Detach before the connection goes back to the pool, so a late
+            # abort() cannot shut down a socket another request is using
+            aborted = handle is not None and handle.detach()
+            if response.will_close or aborted:
+                conn.close()
+            else:
+                self._release(conn)
+            return response.status, response.msg, data
+
+    def close(self):
+        """Close every idle connection"""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
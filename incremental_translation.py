@@ -0,0 +1,179 @@
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from flow_control import RateLimitedError
+from text_segmentation import chunk_text, is_complete_sentence, split_sentences
+
+# Splits after each line break, keeping it with the line it ends
+LINE_BREAK = re.compile(r'(?<=\n)')
+
+
+class IncrementalTranslator:
+    """Re-translates only the sentences of a buffer that changed since last time
+
+    The buffer is split into sentences; sentences already translated for the
+    same language pair come from a per-sentence cache and only the new or
+    edited ones are sent, packed into batches of at most max_batch_chars.
+    Sentences are also split at line breaks, which batching would fold into
+    spaces, and a sentence longer than max_batch_chars is sent as chunks.
+    translate_many(texts, sl, tl, cancel, wait=True) must return the
+    translations in order (TranslationClient.translate_batch does, in one
+    round trip per batch); cancel is the caller's CancellationToken or None.
+
+    prefetch() sends finished sentences speculatively in the background; a
+    later translate() reuses their results, or waits for them if they are
+    still in flight rather than sending them again. Prefetches pass
+    wait=False and are dropped when the rate limit has no budget left, so
+    they never hold up interactive requests.
+    """
+
+    def __init__(self, translate_many, max_batch_chars=1500, max_entries=5000, max_workers=4):
+        self.translate_many = translate_many
+        self.max_batch_chars = max_batch_chars
+        self.max_entries = max_entries
+        self._sentences = OrderedDict()
+        # Sentences being prefetched, keyed like the cache
+        self._prefetching = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix='incremental')
+
+        self.sentences_reused = 0
+        self.sentences_translated = 0
+        self.chars_sent = 0
+        self.sentences_prefetched = 0
+        self.prefetches_skipped = 0
+
+    def _lookup(self, key):
+        with self._lock:
+            translated = self._sentences.get(key)
+            if translated is not None:
+                self._sentences.move_to_end(key)
+            return translated
+
+    def _store(self, key, translated):
+        with self._lock:
+            self._sentences[key] = translated
+            self._sentences.move_to_end(key)
+            while len(self._sentences) > self.max_entries:
+                self._sentences.popitem(last=False)
+
+    def _pieces(self, text):
+        """Split text into (lead, body, trail) units that reassemble to text"""
+        for sentence in split_sentences(text):
+            for line in LINE_BREAK.split(sentence):
+                body = line.strip()
+                if len(body) > self.max_batch_chars:
+                    parts = chunk_text(line, self.max_batch_chars)
+                else:
+                    parts = [line]
+                for part in parts:
+                    body = part.strip()
+                    start = part.index(body[0]) if body else len(part)
+                    yield part[:start], body, part[start + len(body):]
+
+    def _batches(self, texts):
+        batch = []
+        size = 0
+        for text in texts:
+            if batch and size + len(text) > self.max_batch_chars:
+                yield batch
+                batch = []
+                size = 0
+            batch.append(text)
+            size += len(text)
+        if batch:
+            yield batch
+
+    def prefetch(self, text, sl, tl):
+        """Start translating the finished, unseen sentences of text; returns at once"""
+        batch = []
+        with self._lock:
+            for _, body, _ in self._pieces(text):
+                key = (sl, tl, body)
+                if (is_complete_sentence(body) and key not in self._sentences
+                        and key not in self._prefetching and body not in batch):
+                    batch.append(body)
+            if not batch:
+                return
+            future = self._executor.submit(self._prefetch_batch, batch, sl, tl)
+            for body in batch:
+                self._prefetching[(sl, tl, body)] = future
+            self.sentences_prefetched += len(batch)
+            self.chars_sent += sum(map(len, batch))
+
+    def _prefetch_batch(self, batch, sl, tl):
+        try:
+            results = self.translate_many(batch, sl, tl, None, wait=False)
+            for body, translated in zip(batch, results):
+                self._store((sl, tl, body), translated)
+        except RateLimitedError:
+            # Leave the budget to interactive requests; translate() sends these later
+            with self._lock:
+                self.prefetches_skipped += 1
+                self.sentences_prefetched -= len(batch)
+                self.chars_sent -= sum(map(len, batch))
+        finally:
+            with self._lock:
+                for body in batch:
+                    self._prefetching.pop((sl, tl, body), None)
+
+    def translate(self, text, sl, tl, cancel=None):
+        """Translate text, sending only sentences not seen before for this pair"""
+        pieces = []
+        dirty = []
+        prefetching = set()
+        seen = set()
+        for lead, body, trail in self._pieces(text):
+            pieces.append((lead, body, trail))
+            if body and body not in seen and self._lookup((sl, tl, body)) is None:
+                with self._lock:
+                    future = self._prefetching.get((sl, tl, body))
+                if future is not None:
+                    prefetching.add(future)
+                else:
+                    dirty.append(body)
+            seen.add(body)
+
+        if dirty:
+            batches = list(self._batches(dirty))
+            futures = [self._executor.submit(self.translate_many, batch, sl, tl, cancel)
+                       for batch in batches]
+            for batch, future in zip(batches, futures):
+                for body, translated in zip(batch, future.result()):
+                    self._store((sl, tl, body), translated)
+            with self._lock:
+                self.sentences_translated += len(dirty)
+                self.chars_sent += sum(map(len, dirty))
+
+        for future in prefetching:
+            try:
+                future.result()
+            except Exception:
+                # Fetched again below
+                pass
+
+        parts = []
+        for lead, body, trail in pieces:
+            translated = self._lookup((sl, tl, body)) if body else ''
+            if translated is None:
+                # Evicted while this call was running, or its prefetch failed
+                translated = self.translate_many([body], sl, tl, cancel)[0]
+                self._store((sl, tl, body), translated)
+            parts.append(lead + translated + trail)
+        with self._lock:
+            self.sentences_reused += sum(1 for _, body, _ in pieces if body) - len(dirty)
+        return ''.join(parts)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'cached_sentences': len(self._sentences),
+                'sentences_reused': self.sentences_reused,
+                'sentences_translated': self.sentences_translated,
+                'sentences_prefetched': self.sentences_prefetched,
+                'prefetches_skipped': self.prefetches_skipped,
+                'chars_sent': self.chars_sent
+            }
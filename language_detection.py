@@ -0,0 +1,236 @@
+import math
+from collections import Counter
+
+# Unicode blocks of scripts that identify a language on their own (or nearly)
+SCRIPT_RANGES = [
+    (0x0D80, 0x0DFF, 'sinhala'),
+    (0x0B80, 0x0BFF, 'tamil'),
+    (0x0900, 0x097F, 'devanagari'),
+    (0x0E00, 0x0E7F, 'thai'),
+    (0x0600, 0x06FF, 'arabic'),
+    (0x0400, 0x04FF, 'cyrillic'),
+    (0x1100, 0x11FF, 'hangul'),
+    (0x3130, 0x318F, 'hangul'),
+    (0xAC00, 0xD7AF, 'hangul'),
+    (0x3040, 0x30FF, 'kana'),
+    (0x4E00, 0x9FFF, 'han'),
+    (0x3400, 0x4DBF, 'han'),
+]
+
+SCRIPT_LANGUAGES = {
+    'sinhala': 'si',
+    'tamil': 'ta',
+    'devanagari': 'hi',
+    'thai': 'th',
+    'arabic': 'ar',
+    'cyrillic': 'ru',
+    'hangul': 'ko',
+    'kana': 'ja',
+    'han': 'zh-CN',
+}
+
+# Short samples the Latin-script trigram profiles are built from
+LATIN_SAMPLES = {
+    'en': "the quick brown fox jumps over the lazy dog. how are you today? "
+          "i would like to go to the station. thank you very much for your help. "
+          "where is the nearest hospital? what time does the train leave? "
+          "this is a good place to eat and the weather is nice. please call me when you are ready.",
+    'es': "el rápido zorro marrón salta sobre el perro perezoso. ¿cómo estás hoy? "
+          "me gustaría ir a la estación. muchas gracias por tu ayuda. "
+          "¿dónde está el hospital más cercano? ¿a qué hora sale el tren? "
+          "este es un buen lugar para comer y el tiempo es agradable. por favor llámame cuando estés listo.",
+    'fr': "le rapide renard brun saute par dessus le chien paresseux. comment allez-vous aujourd'hui? "
+          "je voudrais aller à la gare. merci beaucoup pour votre aide. "
+          "où est l'hôpital le plus proche? à quelle heure part le train? "
+          "c'est un bon endroit pour manger et il fait beau. appelez-moi quand vous êtes prêt s'il vous plaît.",
+    'de': "der schnelle braune fuchs springt über den faulen hund. wie geht es dir heute? "
+          "ich möchte zum bahnhof gehen. vielen dank für deine hilfe. "
+          "wo ist das nächste krankenhaus? wann fährt der zug ab? "
+          "das ist ein guter ort zum essen und das wetter ist schön. bitte ruf mich an, wenn du bereit bist.",
+    'it': "la veloce volpe marrone salta sopra il cane pigro. come stai oggi? "
+          "vorrei andare alla stazione. grazie mille per il tuo aiuto. "
+          "dov'è l'ospedale più vicino? a che ora parte il treno? "
+          "questo è un buon posto per mangiare e il tempo è bello. per favore chiamami quando sei pronto.",
+    'pt': "a rápida raposa marrom pula sobre o cão preguiçoso. como você está hoje? "
+          "eu gostaria de ir para a estação. muito obrigado pela sua ajuda. "
+          "onde fica o hospital mais próximo? a que horas sai o trem? "
+          "este é um bom lugar para comer e o tempo está agradável. por favor me ligue quando estiver pronto.",
+    'nl': "de snelle bruine vos springt over de luie hond. hoe gaat het vandaag met je? "
+          "ik wil graag naar het station gaan. heel erg bedankt voor je hulp. "
+          "waar is het dichtstbijzijnde ziekenhuis? hoe laat vertrekt de trein? "
+          "dit is een goede plek om te eten en het weer is mooi. bel me alsjeblieft als je klaar bent.",
+    'sv': "den snabba bruna räven hoppar över den lata hunden. hur mår du idag? "
+          "jag skulle vilja gå till stationen. tack så mycket för din hjälp. "
+          "var ligger närmaste sjukhus? när går tåget? "
+          "det här är ett bra ställe att äta på och vädret är fint. ring mig när du är redo.",
+    'pl': "szybki brązowy lis skacze nad leniwym psem. jak się dzisiaj masz? "
+          "chciałbym pójść na dworzec. bardzo dziękuję za twoją pomoc. "
+          "gdzie jest najbliższy szpital? o której odjeżdża pociąg? "
+          "to jest dobre miejsce do jedzenia i pogoda jest ładna. proszę zadzwoń do mnie, kiedy będziesz gotowy.",
+    'tr': "hızlı kahverengi tilki tembel köpeğin üzerinden atlar. bugün nasılsın? "
+          "istasyona gitmek istiyorum. yardımın için çok teşekkür ederim. "
+          "en yakın hastane nerede? tren saat kaçta kalkıyor? "
+          "burası yemek için iyi bir yer ve hava güzel. hazır olduğunda lütfen beni ara.",
+    'id': "rubah coklat yang cepat melompati anjing yang malas. apa kabar hari ini? "
+          "saya ingin pergi ke stasiun. terima kasih banyak atas bantuan anda. "
+          "di mana rumah sakit terdekat? jam berapa kereta berangkat? "
+          "ini adalah tempat yang bagus untuk makan dan cuacanya bagus. tolong telepon saya kalau sudah siap.",
+}
+
+# Enough to decide; longer texts are judged on their opening characters
+MAX_CHARS = 500
+
+# Lead per trigram another Latin language needs over the pair's own
+PAIR_BIAS = 0.3
+
+
+def script_of(char):
+    """Return the script name of char: one of SCRIPT_RANGES, 'latin', or None"""
+    code = ord(char)
+    if code < 0x250:
+        return 'latin' if char.isalpha() else None
+    for start, end, script in SCRIPT_RANGES:
+        if start <= code <= end:
+            return script
+    return None
+
+
+def dominant_script(text):
+    """Return the script most letters of text are written in, or None"""
+    counts = Counter()
+    for char in text[:MAX_CHARS]:
+        script = script_of(char)
+        if script is not None:
+            counts[script] += 1
+    if not counts:
+        return None
+    # Japanese mixes kana with kanji; any kana at all means Japanese
+    if counts['kana'] and counts['han']:
+        return 'kana'
+    return counts.most_common(1)[0][0]
+
+
+def trigrams(text):
+    text = ' ' + ' '.join(text.lower().split()) + ' '
+    return Counter(text[i:i + 3] for i in range(len(text) - 2))
+
+
+class TrigramModel:
+    """Character trigram profiles for telling same-script languages apart"""
+
+    def __init__(self, samples):
+        self.profiles = {}
+        for lang, sample in samples.items():
+            counts = trigrams(sample)
+            total = sum(counts.values())
+            self.profiles[lang] = {gram: math.log(count / total) for gram, count in counts.items()}
+            # Unseen trigrams score a bit below the rarest seen one
+            self.profiles[lang][None] = math.log(0.5 / total)
+
+    def scores(self, text, candidates=None):
+        grams = trigrams(text[:MAX_CHARS])
+        result = {}
+        for lang, profile in self.profiles.items():
+            if candidates is not None and lang not in candidates:
+                continue
+            unseen = profile[None]
+            result[lang] = sum(profile.get(gram, unseen) * count for gram, count in grams.items())
+        return result
+
+    def best(self, text, candidates=None, margin=1.0):
+        """Return the most likely language, or None if the runner-up is within margin"""
+        ranked = sorted(self.scores(text, candidates).items(), key=lambda item: -item[1])
+        if not ranked:
+            return None
+        if len(ranked) > 1 and ranked[0][1] - ranked[1][1] < margin:
+            return None
+        return ranked[0][0]
+
+
+_latin_model = None
+
+
+def latin_model():
+    global _latin_model
+    if _latin_model is None:
+        _latin_model = TrigramModel(LATIN_SAMPLES)
+    return _latin_model
+
+
+def detect_language(text, candidates=None):
+    """Guess the language code of text locally, or None if unsure
+
+    candidates limits the answer to the given codes.
+    """
+    script = dominant_script(text)
+    if script is None:
+        return None
+    if script != 'latin':
+        lang = SCRIPT_LANGUAGES[script]
+        return lang if candidates is None or lang in candidates else None
+
+    letters = sum(1 for char in text[:MAX_CHARS] if char.isalpha())
+    if letters < 8:
+        return None
+    if candidates is not None:
+        candidates = [lang for lang in candidates if lang in LATIN_SAMPLES]
+    return latin_model().best(text, candidates)
+
+
+class DirectionRouter:
+    """Picks the source language and direction of each utterance for a language pair
+
+    Text in the pair's source language goes sl -> tl as configured; text in
+    the target language is translated the other way; text in some other
+    candidate language is translated into tl. When a non-Latin script matches
+    one side of the pair no n-gram scoring is needed at all. Latin text is
+    always scored, since many candidates share that script; the pair's Latin
+    side is only assumed when the model is unsure.
+    """
+
+    def __init__(self, sl, tl, candidates=None):
+        self.sl = sl
+        self.tl = tl
+        self.candidates = set(candidates) if candidates is not None else None
+
+    def detect(self, text):
+        script = dominant_script(text)
+        if script is None:
+            return None
+        pair = [lang for lang in (self.sl, self.tl) if language_script(lang) == script]
+        if script == 'latin':
+            return self._detect_latin(text, pair)
+        # Otherwise the script often settles it outright
+        if len(pair) == 1:
+            return pair[0]
+        return detect_language(text, self.candidates)
+
+    def _detect_latin(self, text, pair):
+        lang = detect_language(text, self.candidates)
+        if len(pair) != 1:
+            return lang
+        own = pair[0]
+        if lang is None or lang == own or own not in LATIN_SAMPLES:
+            return lang or own
+        # Short texts of the pair's own language can edge out a neighbour;
+        # leave the pair only on a clear lead per trigram
+        scores = latin_model().scores(text, [lang, own])
+        grams = sum(trigrams(text[:MAX_CHARS]).values())
+        return lang if scores[lang] - scores[own] >= PAIR_BIAS * grams else own
+
+    def route(self, text):
+        """Return (sl, tl) to translate text with"""
+        lang = self.detect(text)
+        if lang is None or lang == self.sl:
+            return self.sl, self.tl
+        if lang == self.tl:
+            return self.tl, self.sl
+        return lang, self.tl
+
+
+def language_script(lang):
+    """Return the script name a language code is written in"""
+    for script, code in SCRIPT_LANGUAGES.items():
+        if code == lang:
+            return script
+    return 'latin'
@@ -0,0 +1,150 @@
+import gzip
+import json
+import random
+import sys
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def fake_translate(text, sl, tl):
+    """Deterministic stand-in translation used by the mock server"""
+    return f"[{tl}] {text}" if text.strip() else text
+
+
+def build_result(text, sl, tl):
+    """Build a translate_a/single response with one segment per line, like Google"""
+    lines = text.split('\n')
+    segments = []
+    for i, line in enumerate(lines):
+        ending = '\n' if i < len(lines) - 1 else ''
+        segments.append([fake_translate(line, sl, tl) + ending, line + ending, None, None, 10])
+    return [segments, None, sl]
+
+
+class MockTranslateHandler(BaseHTTPRequestHandler):
+    """Serves translate_a/single with the same response shape as the gtx endpoint"""
+
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        parsed = urllib.parse.urlsplit(self.path)
+        if parsed.path != '/translate_a/single':
+            self.send_error(404)
+            return
+
+        params = urllib.parse.parse_qs(parsed.query)
+        text = params.get('q', [''])[0]
+        sl = params.get('sl', ['auto'])[0]
+        tl = params.get('tl', ['en'])[0]
+
+        delay, fail = self.server.next_outcome()
+        if delay:
+            time.sleep(delay)
+        if fail:
+            body = b'Service Unavailable'
+            self.send_response(self.server.error_status)
+            self.send_header('Content-Type', 'text/plain')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+
+        result = build_result(text, sl, tl)
+        body = json.dumps(result, ensure_ascii=False).encode('utf-8')
+
+        self.send_response(200)
+        if self.server.compress and 'gzip' in self.headers.get('Accept-Encoding', ''):
+            body = gzip.compress(body)
+            self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class MockTranslateServer(ThreadingHTTPServer):
+    """Local stand-in for translate.googleapis.com with configurable behaviour
+
+    latency:     base seconds before each response
+    jitter:      extra random seconds, uniform in [0, jitter]
+    error_rate:  fraction of requests answered with error_status
+    seed:        makes the latency/error sequence reproducible
+    """
+
+    daemon_threads = True
+    # Benchmarks open hundreds of connections at once
+    request_queue_size = 1024
+
+    def __init__(self, address, latency=0.0, jitter=0.0, error_rate=0.0,
+                 error_status=503, compress=True, seed=None):
+        super().__init__(address, MockTranslateHandler)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.compress = compress
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+
+    def next_outcome(self):
+        """Return (delay, fail) for the next request"""
+        with self._lock:
+            self.requests += 1
+            delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0.0)
+            fail = self.error_rate > 0 and self._random.random() < self.error_rate
+            if fail:
+                self.errors += 1
+        return delay, fail
+
+    def handle_error(self, request, client_address):
+        # Clients abort hedged and superseded requests; that is not an error
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+def start_server(host='127.0.0.1', port=0, **options):
+    """Start the mock server in a daemon thread and return (server, base_url)
+
+    options are passed to MockTranslateServer (latency, jitter, error_rate, ...).
+    """
+    server = MockTranslateServer((host, port), **options)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Local stand-in for translate.googleapis.com")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.0, help="seconds per response")
+    parser.add_argument('--jitter', type=float, default=0.0, help="extra random seconds per response")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="fraction of requests that fail")
+    parser.add_argument('--error-status', type=int, default=503)
+    parser.add_argument('--no-compress', action='store_true', help="never gzip responses")
+    parser.add_argument('--seed', type=int, help="seed for reproducible latency and errors")
+    args = parser.parse_args()
+
+    server = MockTranslateServer((args.host, args.port), latency=args.latency,
+                                 jitter=args.jitter, error_rate=args.error_rate,
+                                 error_status=args.error_status,
+                                 compress=not args.no_compress, seed=args.seed)
+    print(f"Mock translate server on http://{args.host}:{args.port}")
+    print(f"Run the apps with TRANSLATOR_BASE_URL=http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
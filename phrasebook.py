@@ -0,0 +1,107 @@
+import gzip
+import json
+import os
+import time
+
+# Built next to the apps by `python phrasebook.py`
+PHRASEBOOK_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'phrasebook.json.gz')
+FORMAT_VERSION = 1
+
+
+class Phrasebook:
+    """Precompiled translations of fixed phrase catalogs
+
+    Phrases are stored once, in the source language; each target language
+    holds a list of translations aligned with them.
+    """
+
+    def __init__(self, source='en', phrases=None, translations=None):
+        self.source = source
+        self.phrases = list(phrases or [])
+        self.translations = translations or {}
+        self._index = {phrase: i for i, phrase in enumerate(self.phrases)}
+
+    def __len__(self):
+        return len(self.phrases)
+
+    def lookup(self, phrase, tl, sl=None):
+        """Return the stored translation of phrase into tl, or None"""
+        if sl is not None and sl != self.source:
+            return None
+        if tl == self.source and phrase in self._index:
+            return phrase
+        i = self._index.get(phrase)
+        targets = self.translations.get(tl)
+        if i is None or targets is None:
+            return None
+        return targets[i]
+
+    @classmethod
+    def build(cls, phrases, languages, translate_many, source='en'):
+        """Translate phrases into every language with translate_many(texts, sl, tl)"""
+        phrases = list(dict.fromkeys(phrases))
+        translations = {}
+        for tl in languages:
+            if tl != source:
+                translations[tl] = translate_many(phrases, source, tl)
+        return cls(source, phrases, translations)
+
+    def save(self, path=PHRASEBOOK_PATH):
+        data = {
+            'version': FORMAT_VERSION,
+            'source': self.source,
+            'phrases': self.phrases,
+            'translations': self.translations
+        }
+        tmp_path = path + '.tmp'
+        with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path=PHRASEBOOK_PATH):
+        """Load a phrasebook; a missing or unreadable file gives an empty one"""
+        try:
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return cls()
+        if data.get('version') != FORMAT_VERSION:
+            return cls()
+        return cls(data['source'], data['phrases'], data['translations'])
+
+
+def catalog_phrases(*catalogs):
+    """Flatten {category: [phrases]} catalogs into one list of phrases"""
+    return [phrase for catalog in catalogs for phrases in catalog.values() for phrase in phrases]
+
+
+def main():
+    import argparse
+
+    from final_voice_translator import LANGUAGES, QUICK_PHRASES, SAMPLE_TEXTS, VOICE_COMMANDS
+    from translation_backends import create_backend
+    from translation_client import TranslationClient, get_client
+
+    parser = argparse.ArgumentParser(description="Precompile the phrase catalogs into every language")
+    parser.add_argument('--output', default=PHRASEBOOK_PATH)
+    parser.add_argument('--backend', help="Backend name (default: TRANSLATOR_BACKEND or gtx)")
+    parser.add_argument('--base-url', help="Translation endpoint, e.g. a local mock server")
+    args = parser.parse_args()
+
+    if args.backend or args.base_url:
+        client = TranslationClient(backend=create_backend(args.backend, args.base_url))
+    else:
+        client = get_client()
+
+    phrases = catalog_phrases(QUICK_PHRASES, VOICE_COMMANDS, SAMPLE_TEXTS)
+    languages = [code for name, code in LANGUAGES]
+    start = time.monotonic()
+    book = Phrasebook.build(phrases, languages, client.translate_batch)
+    book.save(args.output)
+    print(f"Wrote {len(book)} phrases x {len(book.translations)} languages to {args.output} "
+          f"in {time.monotonic() - start:.1f}s ({os.path.getsize(args.output)} bytes)")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,12 +2,11 @@ import tkinter as tk
 from tkinter import ttk, scrolledtext, messagebox
 import threading
 import time
-import urllib.request
-import urllib.parse
-import json
 import subprocess
 import os
 
+from translation_client import translate
+
 class PracticalVoiceTranslator:
     def __init__(self, root):
         self.root = root
@@ -462,29 +461,7 @@ class PracticalVoiceTranslator:
     def translate_text(self, text):
         """Translate using Google Translate"""
         try:
-            base_url = "https://translate.googleapis.com/translate_a/single"
-            params = {
-                'client': 'gtx',
-                'sl': self.input_lang,
-                'tl': self.output_lang,
-                'dt': 't',
-                'q': text
-            }
-
-            url = base_url + '?' + urllib.parse.urlencode(params)
-            headers = {'User-Agent': 'Mozilla/5.0'}
-
-            request = urllib.request.Request(url, headers=headers)
-            response = urllib.request.urlopen(request, timeout=10)
-            result = json.loads(response.read().decode('utf-8'))
-
-            translated_text = ''
-            if result and len(result) > 0 and result[0]:
-                for sentence in result[0]:
-                    if sentence[0]:
-                        translated_text += sentence[0]
-
-            return translated_text
+            return translate(text, self.input_lang, self.output_lang)
         except Exception as e:
             print(f"Translation error: {e}")
             return None
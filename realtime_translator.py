@@ -3,9 +3,8 @@ from tkinter import ttk, scrolledtext, messagebox
 import threading
 import queue
 import time
-import urllib.request
-import urllib.parse
-import json
+
+from translation_client import translate, translate_fanout
 
 # Try importing speech recognition
 try:
@@ -100,6 +99,24 @@ class RealtimeTranslator:
         self.input_lang_combo.bind('<<ComboboxSelected>>', self.update_languages)
         self.output_lang_combo.bind('<<ComboboxSelected>>', self.update_languages)
 
+        # Fan-out: translate each input into every ticked language at once
+        self.common_languages = common_languages
+        fanout_row = ttk.Frame(lang_frame)
+        fanout_row.grid(row=1, column=0, columnspan=4, pady=(10, 0), sticky=tk.W)
+        ttk.Label(fanout_row, text="Also translate to / තවත් භාෂා:").pack(side=tk.LEFT, padx=5)
+        self.fanout_vars = {}
+        # Ticked languages, refreshed on the UI thread for the worker threads
+        self.fanout_codes = []
+        for code in common_languages:
+            var = tk.BooleanVar(value=False)
+            ttk.Checkbutton(fanout_row, text=code, variable=var,
+                            command=self.rebuild_fanout_panes).pack(side=tk.LEFT)
+            self.fanout_vars[code] = var
+
+        # One labeled pane per fan-out target, shown below the conversation
+        self.fanout_frame = ttk.Frame(main_frame)
+        self.fanout_panes = {}
+
         control_frame = ttk.Frame(main_frame)
         control_frame.grid(row=3, column=0, columnspan=3, pady=20)
 
@@ -165,6 +182,60 @@ class RealtimeTranslator:
         self.input_lang = input_selection.split('(')[-1].rstrip(')')
         self.output_lang = output_selection.split('(')[-1].rstrip(')')
 
+    def rebuild_fanout_panes(self):
+        """Lay out one labeled result pane per ticked fan-out language"""
+        for child in self.fanout_frame.winfo_children():
+            child.destroy()
+        self.fanout_panes = {}
+
+        targets = [code for code, var in self.fanout_vars.items() if var.get()]
+        self.fanout_codes = targets
+        if not targets:
+            self.fanout_frame.grid_remove()
+            return
+        self.fanout_frame.grid(row=6, column=0, columnspan=3, pady=5, sticky=(tk.W, tk.E))
+        for i, code in enumerate(targets):
+            pane_frame = ttk.LabelFrame(self.fanout_frame, text=self.common_languages[code], padding="5")
+            pane_frame.grid(row=i // 3, column=i % 3, padx=5, pady=5, sticky=(tk.W, tk.E))
+            self.fanout_frame.grid_columnconfigure(i % 3, weight=1)
+            pane = scrolledtext.ScrolledText(pane_frame, width=30, height=4,
+                                             wrap=tk.WORD, font=('Arial', 11))
+            pane.pack(fill=tk.BOTH, expand=True)
+            pane.tag_config("pending", foreground="gray")
+            self.fanout_panes[code] = pane
+
+    def translate_fanout(self, text, targets):
+        """Translate text into every fan-out language concurrently; call from a worker thread"""
+        for code in targets:
+            # The input language's pane just shows the original
+            self.root.after(0, self.show_fanout_result, code,
+                            text if code == self.input_lang else None, None)
+
+        start = time.monotonic()
+        results = translate_fanout(text, self.input_lang, targets,
+                                   lambda code, translated, error: self.root.after(
+                                       0, self.show_fanout_result, code, translated, error))
+        elapsed = int((time.monotonic() - start) * 1000)
+        self.root.after(0, lambda: self.status_label.configure(
+            text=f"Translated into {len(results)} languages in {elapsed} ms / පරිවර්තනය සම්පූර්ණයි",
+            foreground="green"))
+
+    def show_fanout_result(self, code, translated, error):
+        """Show a placeholder (translated and error both None), a result or an error in a pane"""
+        pane = self.fanout_panes.get(code)
+        if pane is None:
+            return
+        ranges = pane.tag_ranges("pending")
+        if ranges:
+            pane.delete(ranges[0], ranges[1])
+        if translated is not None:
+            pane.insert(tk.END, f"{translated}\n")
+        elif error is not None:
+            pane.insert(tk.END, f"❌ {error}\n")
+        else:
+            pane.insert(tk.END, "...\n", "pending")
+        pane.see(tk.END)
+
     def toggle_listening(self):
         if not self.speech_available or not self.microphone:
             messagebox.showwarning("Speech Recognition Not Available",
@@ -238,6 +309,11 @@ class RealtimeTranslator:
             self.root.after(0, lambda: self.status_label.configure(
                 text="Translating... / පරිවර්තනය කරමින්...", foreground="purple"))
 
+            targets = self.fanout_codes
+            if targets:
+                # The panes fill in alongside the main translation
+                threading.Thread(target=self.translate_fanout, args=(text, targets), daemon=True).start()
+
             # Use Google Translate API directly
             translated_text = self.translate_text(text)
 
@@ -269,31 +345,7 @@ class RealtimeTranslator:
     def translate_text(self, text):
         """Translate text using Google Translate API"""
         try:
-            base_url = "https://translate.googleapis.com/translate_a/single"
-            params = {
-                'client': 'gtx',
-                'sl': self.input_lang,
-                'tl': self.output_lang,
-                'dt': 't',
-                'q': text
-            }
-
-            url = base_url + '?' + urllib.parse.urlencode(params)
-            headers = {'User-Agent': 'Mozilla/5.0'}
-
-            request = urllib.request.Request(url, headers=headers)
-            response = urllib.request.urlopen(request, timeout=10)
-            result = json.loads(response.read().decode('utf-8'))
-
-            # Extract translated text
-            translated_text = ''
-            if result and len(result) > 0 and result[0]:
-                for sentence in result[0]:
-                    if sentence[0]:
-                        translated_text += sentence[0]
-
-            return translated_text
-
+            return translate(text, self.input_lang, self.output_lang)
         except Exception as e:
             print(f"Translation error: {e}")
             return None
@@ -319,6 +371,9 @@ class RealtimeTranslator:
 
         # Translate
         self.status_label.configure(text="Translating... / පරිවර්තනය කරමින්...", foreground="orange")
+        if self.fanout_codes:
+            threading.Thread(target=self.translate_fanout, args=(text, self.fanout_codes),
+                             daemon=True).start()
         translated_text = self.translate_text(text)
 
         if translated_text:
@@ -0,0 +1,146 @@
+import http.client
+import random
+import threading
+import time
+from concurrent.futures import CancelledError
+
+
+class CircuitOpenError(Exception):
+    """Raised without touching the network while the circuit breaker is open"""
+
+
+def is_retryable(error):
+    """Return True for errors worth retrying: network failures, timeouts, 429 and 5xx"""
+    if isinstance(error, (CircuitOpenError, CancelledError)):
+        return False
+    status = getattr(error, 'status', None)
+    if status is not None:
+        return status == 429 or status >= 500
+    return isinstance(error, (OSError, http.client.HTTPException))
+
+
+class RetryPolicy:
+    """Retries retryable errors with capped exponential backoff and full jitter
+
+    With a `deadline` (seconds), a retry is skipped when another attempt as
+    slow as the failed one would end past it, so a timeout is not waited
+    out several times over.
+    """
+
+    def __init__(self, max_attempts=3, base_delay=0.2, max_delay=2.0, deadline=None):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+        self.retries = 0
+
+    def delay(self, attempt):
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    def backoff(self, error, attempt, start, attempt_start):
+        """Seconds to wait before retrying a failed attempt, or None to give up
+
+        start and attempt_start are the monotonic times the call and the
+        failed attempt began.
+        """
+        if attempt == self.max_attempts - 1 or not is_retryable(error):
+            return None
+        delay = self.delay(attempt)
+        if self.deadline is not None:
+            now = time.monotonic()
+            if now - start + delay + (now - attempt_start) > self.deadline:
+                return None
+        return delay
+
+    def call(self, func):
+        start = time.monotonic()
+        for attempt in range(self.max_attempts):
+            attempt_start = time.monotonic()
+            try:
+                return func()
+            except Exception as e:
+                delay = self.backoff(e, attempt, start, attempt_start)
+                if delay is None:
+                    raise
+                self.retries += 1
+                time.sleep(delay)
+
+
+class CircuitBreaker:
+    """Fails fast after repeated backend failures and probes for recovery
+
+    After `failure_threshold` consecutive retryable failures the breaker
+    opens and every call raises CircuitOpenError immediately. Once
+    `reset_timeout` seconds have passed it lets a single probe through
+    (half-open); a successful probe closes it again, a failed one reopens it.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold=5, reset_timeout=10.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+        self.rejected = 0
+        self.trips = 0
+
+    def allow(self):
+        """Raise CircuitOpenError unless a call may go out now"""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return
+            if self.state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+            if self.state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return
+            self.rejected += 1
+        raise CircuitOpenError("Translation service unavailable, retrying shortly")
+
+    def record(self, success):
+        with self._lock:
+            self._probe_in_flight = False
+            if success:
+                self.state = self.CLOSED
+                self._failures = 0
+                return
+            self._failures += 1
+            if self.state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    self.trips += 1
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+
+    def call(self, func):
+        self.allow()
+        try:
+            result = func()
+        except CancelledError:
+            # A cancelled call says nothing about backend health; just free
+            # the half-open probe slot
+            with self._lock:
+                self._probe_in_flight = False
+            raise
+        except Exception as e:
+            # Client errors (4xx, bad input) say nothing about backend health
+            self.record(not is_retryable(e))
+            raise
+        self.record(True)
+        return result
+
+    def stats(self):
+        with self._lock:
+            return {
+                'state': self.state,
+                'consecutive_failures': self._failures,
+                'trips': self.trips,
+                'rejected': self.rejected
+            }
@@ -2,6 +2,12 @@ import tkinter as tk
 from tkinter import ttk, scrolledtext, messagebox
 from googletrans import Translator, LANGUAGES
 import threading
+import time
+
+from flow_control import AdaptiveDebouncer
+from incremental_translation import IncrementalTranslator
+from text_segmentation import SENTENCE_TERMINATORS
+from translation_client import get_client
 
 class SimpleTranslator:
     def __init__(self, root):
@@ -13,6 +19,11 @@ class SimpleTranslator:
         self.input_lang = 'en'
         self.output_lang = 'si'
 
+        # Real-time mode only sends the sentences that changed since the last pause
+        self.incremental = IncrementalTranslator(self.translate_sentences)
+        # Real-time delay adapts to typing rhythm and translation latency
+        self.debounce = AdaptiveDebouncer()
+
         self.setup_ui()
 
     def setup_ui(self):
@@ -147,11 +158,18 @@ class SimpleTranslator:
 
     def on_text_change(self, event=None):
         if self.realtime_var.get():
+            if event is not None:
+                self.debounce.keystroke()
+            # A typed full stop finishes a sentence; translate it now so the
+            # debounced pass finds it cached
+            if event is not None and event.char and event.char in SENTENCE_TERMINATORS:
+                self.incremental.prefetch(self.input_text.get(1.0, tk.END),
+                                          self.input_lang, self.output_lang)
             # Cancel previous timer if exists
             if hasattr(self, 'timer'):
                 self.root.after_cancel(self.timer)
-            # Set new timer to translate after 500ms of no typing
-            self.timer = self.root.after(500, self.translate_text)
+            # Set new timer to translate once typing pauses
+            self.timer = self.root.after(int(self.debounce.delay() * 1000), self.translate_text)
 
     def translate_text(self):
         input_text = self.input_text.get(1.0, tk.END).strip()
@@ -166,22 +184,45 @@ class SimpleTranslator:
                                  foreground="blue")
 
         # Run translation in separate thread to avoid freezing UI
-        thread = threading.Thread(target=self.perform_translation, args=(input_text,))
+        request = self.debounce.fire() if self.realtime_var.get() else None
+        thread = threading.Thread(target=self.perform_translation, args=(input_text, request))
         thread.daemon = True
         thread.start()
 
-    def perform_translation(self, text):
+    def translate_sentences(self, texts, sl, tl, cancel=None, wait=True):
+        """Translate a list of sentences in one googletrans call (not rate limited)"""
+        return [translated.text for translated in self.translator.translate(texts, src=sl, dest=tl)]
+
+    def perform_translation(self, text, request=None):
+        """Translate on a worker thread; request is the debounce number in real-time mode"""
+        start = time.monotonic()
         try:
-            translated = self.translator.translate(text, src=self.input_lang,
-                                                  dest=self.output_lang)
+            cache = get_client().cache
+            if request is not None:
+                translated_text = self.incremental.translate(text, self.input_lang, self.output_lang)
+                self.debounce.completed(request, time.monotonic() - start)
+            else:
+                translated_text = cache.get(self.input_lang, self.output_lang, text)
+            if translated_text is None:
+                translated = self.translator.translate(text, src=self.input_lang,
+                                                      dest=self.output_lang)
+                translated_text = translated.text
+                cache.put(self.input_lang, self.output_lang, text, translated_text)
+
+            status = "Translation complete / පරිවර්තනය සම්පූර්ණයි"
+            if request is not None:
+                stats = self.debounce.stats()
+                status += f"  (delay {stats['delay_ms']} ms, wasted {stats['wasted_ratio']:.0%})"
 
             # Update UI in main thread
-            self.root.after(0, self.update_output, translated.text)
+            self.root.after(0, self.update_output, translated_text)
             self.root.after(0, lambda: self.status_label.config(
-                text="Translation complete / පරිවර්තනය සම්පූර්ණයි",
+                text=status,
                 foreground="green"))
 
         except Exception as e:
+            if request is not None:
+                self.debounce.completed(request)
             error_msg = f"Error: {str(e)}"
             self.root.after(0, self.update_output, error_msg)
             self.root.after(0, lambda: self.status_label.config(
@@ -1,9 +1,16 @@
 import tkinter as tk
 from tkinter import ttk, scrolledtext, messagebox
-import urllib.request
-import urllib.parse
-import json
-import threading
+import time
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+
+from flow_control import AdaptiveDebouncer
+from http_pool import CancellationToken
+from incremental_translation import IncrementalTranslator
+from language_detection import DirectionRouter
+from resilience import CircuitOpenError
+from text_segmentation import SENTENCE_TERMINATORS
+from translation_client import get_client, translate
+from transliteration import LiveTransliteration
 
 class SimpleTranslatorV2:
     def __init__(self, root):
@@ -14,7 +21,21 @@ class SimpleTranslatorV2:
         self.input_lang = 'en'
         self.output_lang = 'si'
 
+        # Real-time mode only sends the sentences that changed since the last pause
+        self.incremental = IncrementalTranslator(get_client().translate_batch)
+        # Real-time delay adapts to typing rhythm and translation latency
+        self.debounce = AdaptiveDebouncer()
+
+        # Each translation gets a generation number; starting a new one
+        # cancels the previous request and makes its late results stale
+        self.generation = 0
+        self.cancel_token = None
+        self.pending = None
+        self.pending_request = None
+        self.executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='translate')
+
         self.setup_ui()
+        self.update_languages()
 
     def setup_ui(self):
         main_frame = ttk.Frame(self.root, padding="10")
@@ -96,6 +117,11 @@ class SimpleTranslatorV2:
                                            font=('Arial', 9))
         self.input_count_label.grid(row=1, column=0, pady=5, sticky=tk.W)
 
+        # Singlish typed here turns into Sinhala script as you type
+        self.singlish_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(input_frame, text="Singlish → සිංහල", variable=self.singlish_var,
+                        command=self.toggle_singlish).grid(row=1, column=0, pady=5, sticky=tk.E)
+
         # Output frame
         output_frame = ttk.LabelFrame(frames_container, text="Translation / පරිවර්තනය",
                                       padding="10")
@@ -143,6 +169,11 @@ class SimpleTranslatorV2:
                                      foreground="green", font=('Arial', 10))
         self.status_label.grid(row=0, column=0, sticky=tk.W)
 
+        # Chunk progress for long documents, shown only while one is translating
+        self.progress = ttk.Progressbar(status_frame, mode='determinate', length=150)
+        self.progress.grid(row=0, column=2, padx=5)
+        self.progress.grid_remove()
+
         # Instructions
         instructions = ttk.Label(status_frame,
                                text="Type or paste text and click Translate | පෙළ ටයිප් කර හෝ paste කර Translate click කරන්න",
@@ -164,10 +195,15 @@ class SimpleTranslatorV2:
         # Bind events
         self.input_text.bind('<KeyRelease>', self.on_text_change)
         self.input_text.bind('<Control-v>', self.on_paste)
+        self.singlish = LiveTransliteration(self.input_text, enabled=False)
 
         # Timer for real-time translation
         self.timer = None
 
+    def toggle_singlish(self):
+        self.singlish.enabled = self.singlish_var.get()
+        self.singlish.reset()
+
     def update_languages(self, event=None):
         input_selection = self.input_lang_combo.get()
         output_selection = self.output_lang_combo.get()
@@ -175,6 +211,10 @@ class SimpleTranslatorV2:
         self.input_lang = self.lang_dict.get(input_selection, 'en')
         self.output_lang = self.lang_dict.get(output_selection, 'si')
 
+        # Detect the language of each input locally and flip the direction
+        # when the user types in the target language
+        self.router = DirectionRouter(self.input_lang, self.output_lang, self.lang_dict.values())
+
     def toggle_realtime(self):
         if self.realtime_var.get():
             self.translate_button.config(state=tk.DISABLED)
@@ -192,12 +232,18 @@ class SimpleTranslatorV2:
         self.input_count_label.config(text=f"Characters: {char_count}")
 
         if self.realtime_var.get():
+            if event is not None:
+                self.debounce.keystroke()
+            # A typed full stop finishes a sentence; translate it now so the
+            # debounced pass finds it cached
+            if event is not None and event.char and event.char in SENTENCE_TERMINATORS:
+                self.incremental.prefetch(text, *self.router.route(text))
             # Cancel previous timer if exists
             if self.timer:
                 self.root.after_cancel(self.timer)
-            # Set new timer to translate after 800ms of no typing
+            # Set new timer to translate once typing pauses
             if text:
-                self.timer = self.root.after(800, self.translate_text)
+                self.timer = self.root.after(int(self.debounce.delay() * 1000), self.translate_text)
 
     def on_paste(self, event=None):
         # Handle paste event
@@ -207,80 +253,120 @@ class SimpleTranslatorV2:
         input_text = self.input_text.get(1.0, tk.END).strip()
 
         if not input_text:
+            self.cancel_pending()
             self.output_text.config(state=tk.NORMAL)
             self.output_text.delete(1.0, tk.END)
             self.output_text.config(state=tk.DISABLED)
             return
 
-        # Limit text length for API
-        if len(input_text) > 5000:
-            messagebox.showwarning("Text Too Long",
-                                  "Please enter text less than 5000 characters.\nපෙළ අක්ෂර 5000 ට අඩු විය යුතුය.")
-            return
-
-        self.status_label.config(text="Translating... / පරිවර්තනය කරමින්...",
-                                foreground="orange")
+        sl, tl = self.router.route(input_text)
+        status = "Translating... / පරිවර්තනය කරමින්..."
+        if sl != self.input_lang:
+            names = {code: name for name, code in self.lang_dict.items()}
+            status = f"Detected {names.get(sl, sl)} → {names.get(tl, tl)} / භාෂාව හඳුනාගත්තා"
+        self.status_label.config(text=status, foreground="orange")
         self.translate_button.config(state=tk.DISABLED)
 
-        # Run translation in separate thread
-        thread = threading.Thread(target=self.perform_translation, args=(input_text,))
-        thread.daemon = True
-        thread.start()
-
-    def perform_translation(self, text):
+        request = self.debounce.fire() if self.realtime_var.get() else None
+        self.cancel_pending()
+        self.cancel_token = CancellationToken()
+
+        # Run translation on a worker thread
+        self.pending = self.executor.submit(self.perform_translation, input_text, sl, tl,
+                                            request, self.generation, self.cancel_token)
+        self.pending_request = request
+
+    def cancel_pending(self):
+        """Supersede the current translation: drop it if queued, abort it if running"""
+        self.generation += 1
+        if self.pending is not None and self.pending.cancel() and self.pending_request is not None:
+            # Dropped before it started
+            self.debounce.completed(self.pending_request)
+        if self.cancel_token is not None:
+            self.cancel_token.cancel()
+        # Forget the placeholders of a chunked translation that never finished
+        for tag in self.output_text.tag_names():
+            if tag.startswith('chunk'):
+                self.output_text.tag_delete(tag)
+        self.progress.grid_remove()
+
+    def post(self, generation, func, *args, **kwargs):
+        """Run func on the UI thread unless a newer translation has started"""
+        def run():
+            if generation == self.generation:
+                func(*args, **kwargs)
+        self.root.after(0, run)
+
+    def perform_translation(self, text, sl, tl, request, generation, cancel):
+        """Translate on a worker thread; request is the debounce number in real-time mode"""
+        start = time.monotonic()
+        recorded = False
         try:
-            # Using Google Translate API (free tier)
-            base_url = "https://translate.googleapis.com/translate_a/single"
-            params = {
-                'client': 'gtx',
-                'sl': self.input_lang,
-                'tl': self.output_lang,
-                'dt': 't',
-                'q': text
-            }
-
-            url = base_url + '?' + urllib.parse.urlencode(params)
-
-            # Make request
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-            }
-
-            request = urllib.request.Request(url, headers=headers)
-            response = urllib.request.urlopen(request, timeout=10)
-            result = json.loads(response.read().decode('utf-8'))
-
-            # Extract translated text
-            translated_text = ''
-            if result and len(result) > 0 and result[0]:
-                for sentence in result[0]:
-                    if sentence[0]:
-                        translated_text += sentence[0]
+            if request is not None:
+                translated_text = self.incremental.translate(text, sl, tl, cancel)
+                self.debounce.completed(request, time.monotonic() - start)
+                recorded = True
+                stats = self.debounce.stats()
+                self.post(generation, self.update_output, translated_text)
+                self.post(generation, self.status_label.config,
+                          text=(f"Translation complete / පරිවර්තනය සම්පූර්ණයි  "
+                                f"(delay {stats['delay_ms']} ms, wasted {stats['wasted_ratio']:.0%})"),
+                          foreground="green")
+                return
+
+            # Show sentences as they are decoded instead of waiting for the
+            # whole document
+            segments = []
+
+            def show_segment(index, segment):
+                del segments[index:]
+                segments.append(segment)
+                self.post(generation, self.update_output, ''.join(segments))
+
+            # Long documents are translated in chunks; fill each one in as it
+            # finishes rather than waiting for the first chunk in order
+            def show_chunk(index, count, chunk):
+                self.post(generation, self.update_output_chunk, index, count, chunk)
+
+            translated_text = translate(text, sl, tl,
+                                        on_segment=show_segment, on_chunk=show_chunk,
+                                        cancel=cancel)
 
             if translated_text:
                 # Update UI in main thread
-                self.root.after(0, self.update_output, translated_text)
-                self.root.after(0, lambda: self.status_label.config(
-                    text="Translation complete / පරිවර්තනය සම්පූර්ණයි",
-                    foreground="green"))
+                self.post(generation, self.update_output, translated_text)
+                self.post(generation, self.status_label.config,
+                          text="Translation complete / පරිවර්තනය සම්පූර්ණයි",
+                          foreground="green")
             else:
-                self.root.after(0, lambda: self.status_label.config(
-                    text="No translation available / පරිවර්තනයක් නොමැත",
-                    foreground="orange"))
-
-        except urllib.error.URLError:
-            self.root.after(0, lambda: messagebox.showerror(
-                "Connection Error",
-                "No internet connection. Please check your network.\nඅන්තර්ජාල සම්බන්ධතාවය පරීක්ෂා කරන්න."))
-            self.root.after(0, lambda: self.status_label.config(
-                text="Connection error / සම්බන්ධතා දෝෂය",
-                foreground="red"))
+                self.post(generation, self.status_label.config,
+                          text="No translation available / පරිවර්තනයක් නොමැත",
+                          foreground="orange")
+
+        except CancelledError:
+            # Superseded by a newer translation, which owns the UI now
+            return
+        except CircuitOpenError:
+            self.post(generation, self.status_label.config,
+                      text="Service unavailable, try again shortly / සේවාව තාවකාලිකව නොමැත",
+                      foreground="red")
+        except OSError:
+            self.post(generation, messagebox.showerror,
+                      "Connection Error",
+                      "No internet connection. Please check your network.\nඅන්තර්ජාල සම්බන්ධතාවය පරීක්ෂා කරන්න.")
+            self.post(generation, self.status_label.config,
+                      text="Connection error / සම්බන්ධතා දෝෂය",
+                      foreground="red")
         except Exception as e:
-            self.root.after(0, lambda: self.status_label.config(
-                text="Translation error / පරිවර්තන දෝෂය",
-                foreground="red"))
+            self.post(generation, self.status_label.config,
+                      text="Translation error / පරිවර්තන දෝෂය",
+                      foreground="red")
         finally:
-            self.root.after(0, lambda: self.translate_button.config(
+            if request is not None and not recorded:
+                # Failed or superseded; still counts towards the wasted ratio
+                self.debounce.completed(request)
+            self.post(generation, self.progress.grid_remove)
+            self.post(generation, lambda: self.translate_button.config(
                 state=tk.NORMAL if not self.realtime_var.get() else tk.DISABLED))
 
     def update_output(self, text):
@@ -289,7 +375,35 @@ class SimpleTranslatorV2:
         self.output_text.insert(1.0, text)
         self.output_text.config(state=tk.DISABLED)
 
+    def update_output_chunk(self, index, count, text):
+        """Replace one chunk's placeholder with its translation"""
+        self.output_text.config(state=tk.NORMAL)
+        if not self.output_text.tag_ranges('chunk0'):
+            # First chunk back: lay out a placeholder per chunk, each under
+            # its own tag so it can be swapped without touching the rest
+            self.output_text.delete(1.0, tk.END)
+            for i in range(count):
+                self.output_text.insert(tk.END, "[ ... ]\n\n", (f'chunk{i}', 'pending'))
+            self.output_text.tag_config('pending', foreground="gray")
+            self.chunks_done = 0
+            self.progress.config(maximum=count, value=0)
+            self.progress.grid()
+
+        tag = f'chunk{index}'
+        ranges = self.output_text.tag_ranges(tag)
+        if ranges:
+            self.output_text.delete(ranges[0], ranges[1])
+            self.output_text.insert(ranges[0], text, tag)
+        self.output_text.config(state=tk.DISABLED)
+
+        self.chunks_done += 1
+        self.progress.config(value=self.chunks_done)
+        self.status_label.config(
+            text=f"Translating... {self.chunks_done}/{count} / පරිවර්තනය කරමින්... {self.chunks_done}/{count}",
+            foreground="orange")
+
     def clear_text(self):
+        self.cancel_pending()
         self.input_text.delete(1.0, tk.END)
         self.output_text.config(state=tk.NORMAL)
         self.output_text.delete(1.0, tk.END)
@@ -0,0 +1,96 @@
+import re
+
+# Sentence-final punctuation: Latin . ? !, Sinhala kunddaliya, Devanagari
+# danda and CJK full stops. A boundary also needs whitespace (or the end of
+# the text) after it, so "3.14" and "e.g.x" stay whole.
+SENTENCE_TERMINATORS = '.?!෴।。？！'
+CLOSING_QUOTES = '"\'”’)]'
+SENTENCE_END = re.compile(r'(?<=[' + re.escape(SENTENCE_TERMINATORS) + r'])'
+                          r'(?:[' + re.escape(CLOSING_QUOTES) + r']*)(?=\s|$)')
+PARAGRAPH_BREAK = re.compile(r'\n\s*\n')
+
+
+def is_complete_sentence(text):
+    """Return True if text ends with sentence-final punctuation"""
+    last = text.rstrip().rstrip(CLOSING_QUOTES)[-1:]
+    return bool(last) and last in SENTENCE_TERMINATORS
+
+
+def split_paragraphs(text):
+    """Split text into paragraphs, keeping each separator on the preceding piece"""
+    pieces = []
+    start = 0
+    for match in PARAGRAPH_BREAK.finditer(text):
+        pieces.append(text[start:match.end()])
+        start = match.end()
+    if start < len(text):
+        pieces.append(text[start:])
+    return pieces
+
+
+def split_sentences(text):
+    """Split text into sentences so that ''.join(result) == text
+
+    Trailing whitespace stays with the sentence it follows.
+    """
+    pieces = []
+    start = 0
+    for match in SENTENCE_END.finditer(text):
+        end = match.end()
+        # Swallow the whitespace after the boundary
+        while end < len(text) and text[end].isspace():
+            end += 1
+        if end > start:
+            pieces.append(text[start:end])
+        start = end
+    if start < len(text):
+        pieces.append(text[start:])
+    return pieces
+
+
+def _split_oversized(piece, max_chars):
+    """Split a piece with no usable sentence boundary at whitespace, or hard-split it"""
+    parts = []
+    while len(piece) > max_chars:
+        cut = piece.rfind(' ', 0, max_chars)
+        if cut <= 0:
+            cut = max_chars
+        else:
+            cut += 1
+        parts.append(piece[:cut])
+        piece = piece[cut:]
+    if piece:
+        parts.append(piece)
+    return parts
+
+
+def chunk_text(text, max_chars=1500):
+    """Pack text into chunks of at most max_chars, breaking at paragraphs, then sentences
+
+    ''.join(chunks) == text, so chunks can be translated independently and
+    reassembled in order.
+    """
+    if len(text) <= max_chars:
+        return [text] if text else []
+
+    units = []
+    for paragraph in split_paragraphs(text):
+        if len(paragraph) <= max_chars:
+            units.append(paragraph)
+            continue
+        for sentence in split_sentences(paragraph):
+            if len(sentence) <= max_chars:
+                units.append(sentence)
+            else:
+                units.extend(_split_oversized(sentence, max_chars))
+
+    chunks = []
+    current = ''
+    for unit in units:
+        if current and len(current) + len(unit) > max_chars:
+            chunks.append(current)
+            current = ''
+        current += unit
+    if current:
+        chunks.append(current)
+    return chunks
@@ -0,0 +1,125 @@
+import time
+import xml.etree.ElementTree as ET
+from xml.sax.saxutils import escape, quoteattr
+
+XML_LANG = '{http://www.w3.org/XML/1998/namespace}lang'
+TMX_VERSION = '1.4'
+
+# Inline elements that hold native markup codes rather than text
+MARKUP_TAGS = ('bpt', 'ept', 'it', 'ph', 'ut')
+
+
+def tmx_language(code):
+    """Map a TMX language tag such as 'si-LK' or 'EN-us' to the app's codes"""
+    code = code.replace('_', '-')
+    primary = code.split('-')[0].lower()
+    if primary == 'zh':
+        return 'zh-TW' if code.lower() in ('zh-tw', 'zh-hant', 'zh-hk') else 'zh-CN'
+    return primary
+
+
+def segment_text(seg):
+    """Text of a <seg>, keeping <hi> content and dropping inline markup codes"""
+    parts = [seg.text or '']
+    for child in seg:
+        if child.tag not in MARKUP_TAGS:
+            parts.append(segment_text(child))
+        parts.append(child.tail or '')
+    return ''.join(parts)
+
+
+def iter_units(path):
+    """Yield each translation unit of a TMX file as a {language: text} dict
+
+    The file is parsed incrementally and every unit is discarded once read,
+    so memory use does not grow with the size of the file.
+    """
+    body = None
+    for event, elem in ET.iterparse(path, events=('start', 'end')):
+        if event == 'start':
+            if elem.tag == 'body':
+                body = elem
+            continue
+        if elem.tag != 'tu':
+            continue
+        unit = {}
+        for tuv in elem.iter('tuv'):
+            lang = tuv.get(XML_LANG) or tuv.get('lang')
+            seg = tuv.find('seg')
+            if lang and seg is not None:
+                text = segment_text(seg).strip()
+                if text:
+                    unit[tmx_language(lang)] = text
+        if body is not None:
+            body.clear()
+        yield unit
+
+
+def iter_pairs(units, languages=None):
+    """Turn units into (sl, tl, source, translated) rows for every direction"""
+    for unit in units:
+        if languages is not None:
+            unit = {lang: text for lang, text in unit.items() if lang in languages}
+        for sl, source in unit.items():
+            for tl, translated in unit.items():
+                if sl != tl:
+                    yield sl, tl, source, translated
+
+
+def import_tmx(path, cache, languages=None, batch_size=10000):
+    """Load a TMX file into the translation cache; returns the number of rows stored"""
+    return cache.bulk_put(iter_pairs(iter_units(path), languages), batch_size)
+
+
+def export_tmx(path, rows, creation_tool='Sinhala-English Translator'):
+    """Write (sl, tl, source, translated) rows to a TMX file, one unit per row"""
+    count = 0
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+        f.write(f'<tmx version="{TMX_VERSION}">\n')
+        f.write(f'  <header creationtool={quoteattr(creation_tool)} creationtoolversion="1.0"'
+                ' segtype="sentence" o-tmf="sqlite" adminlang="en" srclang="*all*"'
+                ' datatype="plaintext"/>\n')
+        f.write('  <body>\n')
+        for sl, tl, source, translated in rows:
+            f.write(f'    <tu srclang={quoteattr(sl)}>\n'
+                    f'      <tuv xml:lang={quoteattr(sl)}><seg>{escape(source)}</seg></tuv>\n'
+                    f'      <tuv xml:lang={quoteattr(tl)}><seg>{escape(translated)}</seg></tuv>\n'
+                    f'    </tu>\n')
+            count += 1
+        f.write('  </body>\n</tmx>\n')
+    return count
+
+
+def main():
+    import argparse
+
+    from translation_cache import MemoryCache
+    from translation_client import get_client
+
+    parser = argparse.ArgumentParser(description="Import or export translation memories as TMX")
+    commands = parser.add_subparsers(dest='command', required=True)
+    import_parser = commands.add_parser('import', help="Load a TMX file into the translation cache")
+    import_parser.add_argument('path')
+    import_parser.add_argument('--languages', nargs='+', help="Only import these language codes")
+    export_parser = commands.add_parser('export', help="Write the translation cache to a TMX file")
+    export_parser.add_argument('path')
+    export_parser.add_argument('--sl', help="Only export this source language")
+    export_parser.add_argument('--tl', help="Only export this target language")
+    args = parser.parse_args()
+
+    cache = get_client().cache
+    if cache is None or isinstance(cache, MemoryCache):
+        parser.error("the persistent translation cache is disabled")
+
+    start = time.monotonic()
+    if args.command == 'import':
+        count = import_tmx(args.path, cache, args.languages)
+        print(f"Imported {count} translations from {args.path} in {time.monotonic() - start:.1f}s")
+    else:
+        count = export_tmx(args.path, cache.entries(args.sl, args.tl))
+        print(f"Exported {count} translations to {args.path} in {time.monotonic() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
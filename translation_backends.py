@@ -0,0 +1,168 @@
+import codecs
+import json
+import urllib.parse
+
+from http_pool import ConnectionPool
+
+# Base URL of the translation endpoint. Point TRANSLATOR_BASE_URL at a local
+# stand-in (e.g. http://127.0.0.1:8765) to run without the internet.
+DEFAULT_BASE_URL = "https://translate.googleapis.com"
+TRANSLATE_PATH = "/translate_a/single"
+USER_AGENT = 'Mozilla/5.0'
+
+
+class TranslationError(Exception):
+    """Raised when the translation endpoint returns an unusable response"""
+
+    def __init__(self, message, status=None):
+        super().__init__(message)
+        self.status = status
+
+
+class SegmentStreamParser:
+    """Incrementally extracts the result[0] sentence segments of a translate_a/single body
+
+    feed() takes raw bytes as they arrive; on_segment(index, text) is called
+    as soon as each segment array is complete, without waiting for the rest
+    of the document.
+    """
+
+    def __init__(self, on_segment):
+        self.on_segment = on_segment
+        self.count = 0
+        self._decoder = codecs.getincrementaldecoder('utf-8')()
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._buf = []
+        self._done = False
+
+    def feed(self, data):
+        if self._done:
+            return
+        for ch in self._decoder.decode(data):
+            if self._depth >= 3:
+                self._buf.append(ch)
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == '\\':
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                continue
+
+            if ch == '"':
+                self._in_string = True
+            elif ch == '[':
+                self._depth += 1
+                if self._depth == 3:
+                    self._buf = ['[']
+            elif ch == ']':
+                self._depth -= 1
+                if self._depth == 2:
+                    segment = json.loads(''.join(self._buf))
+                    if segment and segment[0]:
+                        self.on_segment(self.count, segment[0])
+                        self.count += 1
+                elif self._depth <= 1:
+                    # End of result[0]; later fields are not needed
+                    self._done = True
+                    return
+            elif self._depth == 1 and not ch.isspace():
+                # result[0] is not an array (e.g. null): nothing to stream
+                self._done = True
+                return
+
+
+def extract_translation(result):
+    """Join the sentence segments of a translate_a/single response"""
+    translated_text = ''
+    if result and len(result) > 0 and result[0]:
+        for sentence in result[0]:
+            if sentence[0]:
+                translated_text += sentence[0]
+    return translated_text
+
+
+class TranslationBackend:
+    """Interface for translation services used by TranslationClient
+
+    translate() performs exactly one attempt; caching, retries, rate and
+    concurrency limits are layered on top by the client. `handle` is a
+    RequestHandle the caller may abort from another thread, and
+    on_segment(index, text) receives sentence segments as they are decoded.
+    """
+
+    name = 'base'
+
+    def translate(self, text, sl, tl, handle=None, on_segment=None):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class GoogleGtxBackend(TranslationBackend):
+    """The unofficial translate_a/single (client=gtx) endpoint, or a stand-in speaking it"""
+
+    name = 'google'
+
+    def __init__(self, base_url=None, pool=None, timeout=10):
+        self.pool = pool or ConnectionPool(base_url or DEFAULT_BASE_URL, timeout=timeout)
+
+    def build_path(self, text, sl, tl):
+        params = {
+            'client': 'gtx',
+            'sl': sl,
+            'tl': tl,
+            'dt': 't',
+            'q': text
+        }
+        return TRANSLATE_PATH + '?' + urllib.parse.urlencode(params)
+
+    @staticmethod
+    def parse(status, data):
+        if status != 200:
+            raise TranslationError(f"HTTP {status} from translation endpoint", status)
+        return extract_translation(json.loads(data.decode('utf-8')))
+
+    def translate(self, text, sl, tl, handle=None, on_segment=None):
+        on_data = SegmentStreamParser(on_segment).feed if on_segment is not None else None
+        status, _, data = self.pool.request('GET', self.build_path(text, sl, tl),
+                                            {'User-Agent': USER_AGENT},
+                                            handle=handle, on_data=on_data)
+        return self.parse(status, data)
+
+    def close(self):
+        self.pool.close()
+
+
+class FakeBackend(TranslationBackend):
+    """In-process deterministic translations, for running without any server"""
+
+    name = 'fake'
+
+    def translate(self, text, sl, tl, handle=None, on_segment=None):
+        from mock_translate_server import build_result
+        segments = build_result(text, sl, tl)[0]
+        if on_segment is not None:
+            for i, segment in enumerate(segments):
+                on_segment(i, segment[0])
+        return extract_translation([segments])
+
+
+BACKENDS = {
+    'google': GoogleGtxBackend,
+    'fake': FakeBackend
+}
+
+
+def create_backend(name=None, base_url=None):
+    """Create a backend by name ('google' or 'fake')"""
+    name = name or 'google'
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown translation backend: {name}")
+    if name == 'google':
+        return GoogleGtxBackend(base_url)
+    return BACKENDS[name]()
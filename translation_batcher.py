@@ -0,0 +1,92 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from translation_client import get_client
+
+
+class MicroBatcher:
+    """Collects translation requests for a short window and sends them as one request
+
+    submit() returns a Future immediately. A worker thread waits up to
+    `window` seconds after the first pending request (or until `max_items` /
+    `max_chars` is reached), then translates everything it collected with a
+    single round trip per language pair. `max_chars` defaults to the
+    client's chunk size, which keeps each request URL within limits.
+    """
+
+    def __init__(self, client=None, window=0.02, max_items=16, max_chars=None):
+        self.client = client or get_client()
+        self.window = window
+        self.max_items = max_items
+        self.max_chars = max_chars or self.client.chunk_chars
+
+        self._queue = queue.Queue()
+        self._carry = None
+
+        self.batches = 0
+        self.requests = 0
+
+        self._worker = threading.Thread(target=self._run, daemon=True)
+        self._worker.start()
+
+    def submit(self, text, sl, tl):
+        """Queue text for translation and return a Future for the result"""
+        future = Future()
+        self._queue.put((text, sl, tl, future))
+        return future
+
+    def translate(self, text, sl, tl):
+        """Blocking convenience wrapper around submit()"""
+        return self.submit(text, sl, tl).result()
+
+    def _collect(self):
+        if self._carry is not None:
+            first, self._carry = self._carry, None
+        else:
+            first = self._queue.get()
+
+        batch = [first]
+        chars = len(first[0])
+        deadline = time.monotonic() + self.window
+        while len(batch) < self.max_items:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if chars + len(item[0]) > self.max_chars:
+                # Too big for this round trip; it starts the next batch
+                self._carry = item
+                break
+            batch.append(item)
+            chars += len(item[0])
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+
+            # Group by language pair, keeping submission order inside each group
+            groups = {}
+            for item in batch:
+                groups.setdefault((item[1], item[2]), []).append(item)
+
+            for (sl, tl), items in groups.items():
+                items = [item for item in items if item[3].set_running_or_notify_cancel()]
+                if not items:
+                    continue
+                futures = [item[3] for item in items]
+                self.batches += 1
+                self.requests += len(items)
+                try:
+                    results = self.client.translate_batch([item[0] for item in items], sl, tl)
+                except Exception as e:
+                    for future in futures:
+                        future.set_exception(e)
+                    continue
+                for future, result in zip(futures, results):
+                    future.set_result(result)
@@ -0,0 +1,385 @@
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+# Rough per-entry bookkeeping cost (key tuple, OrderedDict node, floats)
+ENTRY_OVERHEAD = 120
+
+
+def normalize_text(text):
+    """Normalize text for cache lookups: NFC form with collapsed whitespace"""
+    return ' '.join(unicodedata.normalize('NFC', text).split())
+
+
+def make_key(sl, tl, text):
+    return (sl, tl, normalize_text(text))
+
+
+class MemoryCache:
+    """Thread-safe LRU translation cache bounded by total bytes, with optional TTL"""
+
+    def __init__(self, max_bytes=8 * 1024 * 1024, ttl=None):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+
+        self._entries = OrderedDict()  # key -> (translated, size, expires_at)
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @staticmethod
+    def _entry_size(key, translated):
+        return (len(key[0]) + len(key[1]) + len(key[2].encode('utf-8'))
+                + len(translated.encode('utf-8')) + ENTRY_OVERHEAD)
+
+    def _remove(self, key):
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def get(self, sl, tl, text):
+        """Return the cached translation or None"""
+        key = make_key(sl, tl, text)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            translated, _, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return translated
+
+    def put(self, sl, tl, text, translated):
+        """Store a translation, evicting least recently used entries to stay in budget"""
+        if not translated:
+            return
+        key = make_key(sl, tl, text)
+        size = self._entry_size(key, translated)
+        if size > self.max_bytes:
+            return
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (translated, size, expires_at)
+            self._bytes += size
+
+            while self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def record_use(self, sl, tl, text):
+        """Usage is only tracked by persistent caches"""
+
+    def frequent(self, limit=50):
+        return []
+
+    def bulk_put(self, items, batch_size=10000):
+        """Store many (sl, tl, source, translated) rows; returns how many were given"""
+        count = 0
+        for sl, tl, source, translated in items:
+            self.put(sl, tl, source, translated)
+            count += 1
+        return count
+
+    def entries(self, sl=None, tl=None, limit=None):
+        """Return stored (sl, tl, source, translated) rows, optionally for one pair"""
+        with self._lock:
+            rows = [(key[0], key[1], key[2], entry[0]) for key, entry in self._entries.items()
+                    if (sl is None or key[0] == sl) and (tl is None or key[1] == tl)]
+        return rows[:limit] if limit is not None else rows
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        """Return a snapshot of the cache counters"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
+
+
+class DiskCache:
+    """Persistent translation cache in SQLite (WAL mode) with batched background writes
+
+    Lookups go straight to an indexed table, so opening a large cache costs
+    nothing more than opening the database file. put() only queues the entry;
+    a writer thread commits queued entries in batches. A usage table counts
+    how often each input was requested, across sessions, so the most
+    frequent ones can be warmed up at the next start.
+    """
+
+    def __init__(self, path, flush_interval=0.5):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.flush_interval = flush_interval
+
+        self._read_conn = self._connect()
+        self._read_conn.execute(
+            "CREATE TABLE IF NOT EXISTS translations ("
+            " sl TEXT NOT NULL, tl TEXT NOT NULL, source TEXT NOT NULL,"
+            " translated TEXT NOT NULL, updated REAL NOT NULL,"
+            " PRIMARY KEY (sl, tl, source)) WITHOUT ROWID")
+        self._read_conn.execute(
+            "CREATE TABLE IF NOT EXISTS usage ("
+            " sl TEXT NOT NULL, tl TEXT NOT NULL, source TEXT NOT NULL,"
+            " uses INTEGER NOT NULL, last_used REAL NOT NULL,"
+            " PRIMARY KEY (sl, tl, source)) WITHOUT ROWID")
+        self._read_conn.commit()
+        self._read_lock = threading.Lock()
+
+        self._pending = {}
+        self._pending_uses = {}
+        self._pending_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._closed = False
+
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+
+        self._writer = threading.Thread(target=self._write_loop, daemon=True)
+        self._writer.start()
+
+    def _connect(self):
+        # Wait out a bulk import holding the write lock instead of failing
+        conn = sqlite3.connect(self.path, timeout=60, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def get(self, sl, tl, text):
+        """Return the stored translation or None"""
+        key = make_key(sl, tl, text)
+        with self._pending_lock:
+            translated = self._pending.get(key)
+        if translated is None:
+            with self._read_lock:
+                row = self._read_conn.execute(
+                    "SELECT translated FROM translations WHERE sl = ? AND tl = ? AND source = ?",
+                    key).fetchone()
+            translated = row[0] if row else None
+
+        if translated is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return translated
+
+    def put(self, sl, tl, text, translated):
+        """Queue a translation for the background writer"""
+        if not translated:
+            return
+        with self._pending_lock:
+            self._pending[make_key(sl, tl, text)] = translated
+        self._wakeup.set()
+
+    def record_use(self, sl, tl, text):
+        """Count one request for text; written out with the next batch"""
+        key = make_key(sl, tl, text)
+        with self._pending_lock:
+            self._pending_uses[key] = self._pending_uses.get(key, 0) + 1
+        self._wakeup.set()
+
+    def frequent(self, limit=50):
+        """Return the most requested (sl, tl, source, translated) rows; translated may be None"""
+        with self._read_lock:
+            return self._read_conn.execute(
+                "SELECT u.sl, u.tl, u.source, t.translated FROM usage u"
+                " LEFT JOIN translations t ON t.sl = u.sl AND t.tl = u.tl AND t.source = u.source"
+                " ORDER BY u.uses DESC, u.last_used DESC LIMIT ?", (limit,)).fetchall()
+
+    def bulk_put(self, items, batch_size=10000):
+        """Insert many (sl, tl, source, translated) rows; returns how many were read
+
+        Rows are streamed in batches into an unindexed staging table and
+        merged into the indexed table in one sorted pass at the end, so the
+        index is built once instead of being updated row by row.
+        """
+        conn = self._connect()
+        try:
+            conn.execute("CREATE TEMP TABLE staging (sl TEXT, tl TEXT, source TEXT, translated TEXT)")
+            count = 0
+            batch = []
+            for sl, tl, source, translated in items:
+                if translated:
+                    batch.append((*make_key(sl, tl, source), translated))
+                if len(batch) >= batch_size:
+                    with conn:
+                        conn.executemany("INSERT INTO staging VALUES (?, ?, ?, ?)", batch)
+                    count += len(batch)
+                    batch = []
+            with conn:
+                conn.executemany("INSERT INTO staging VALUES (?, ?, ?, ?)", batch)
+                count += len(batch)
+                conn.execute(
+                    "INSERT OR REPLACE INTO translations (sl, tl, source, translated, updated)"
+                    " SELECT sl, tl, source, translated, ? FROM staging ORDER BY sl, tl, source",
+                    (time.time(),))
+                conn.execute("DROP TABLE staging")
+            return count
+        finally:
+            conn.close()
+
+    def entries(self, sl=None, tl=None, limit=None):
+        """Yield stored (sl, tl, source, translated) rows, optionally for one pair
+
+        Uses its own connection, so a long export does not block lookups.
+        """
+        query = "SELECT sl, tl, source, translated FROM translations"
+        conditions, params = [], []
+        for column, value in (('sl', sl), ('tl', tl)):
+            if value is not None:
+                conditions.append(f"{column} = ?")
+                params.append(value)
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+
+        conn = self._connect()
+        try:
+            cursor = conn.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(1000)
+                if not rows:
+                    break
+                yield from rows
+        finally:
+            conn.close()
+
+    def _write_loop(self):
+        conn = self._connect()
+        while True:
+            self._wakeup.wait()
+            if not self._closed:
+                # Let a burst of puts accumulate into one transaction
+                time.sleep(self.flush_interval)
+            self._flush(conn)
+            if self._closed:
+                self._flush(conn)
+                break
+        conn.close()
+
+    def _flush(self, conn):
+        with self._pending_lock:
+            batch, self._pending = self._pending, {}
+            uses, self._pending_uses = self._pending_uses, {}
+            self._wakeup.clear()
+        if not batch and not uses:
+            return
+        now = time.time()
+        try:
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO translations (sl, tl, source, translated, updated)"
+                    " VALUES (?, ?, ?, ?, ?)",
+                    [(sl, tl, source, translated, now)
+                     for (sl, tl, source), translated in batch.items()])
+                conn.executemany(
+                    "INSERT INTO usage (sl, tl, source, uses, last_used) VALUES (?, ?, ?, ?, ?)"
+                    " ON CONFLICT (sl, tl, source)"
+                    " DO UPDATE SET uses = uses + excluded.uses, last_used = excluded.last_used",
+                    [(sl, tl, source, count, now)
+                     for (sl, tl, source), count in uses.items()])
+            self.writes += len(batch)
+        except sqlite3.Error as e:
+            print(f"Translation cache write error: {e}")
+
+    def close(self):
+        """Write out queued entries and stop the writer thread"""
+        if self._closed:
+            return
+        self._closed = True
+        self._wakeup.set()
+        self._writer.join()
+        with self._read_lock:
+            self._read_conn.close()
+
+    def stats(self):
+        with self._pending_lock:
+            pending = len(self._pending)
+        return {
+            'path': self.path,
+            'hits': self.hits,
+            'misses': self.misses,
+            'writes': self.writes,
+            'pending': pending
+        }
+
+
+class TieredCache:
+    """Memory cache in front of a persistent cache; disk hits are promoted to memory"""
+
+    def __init__(self, memory, disk):
+        self.memory = memory
+        self.disk = disk
+
+    def get(self, sl, tl, text):
+        translated = self.memory.get(sl, tl, text)
+        if translated is None:
+            translated = self.disk.get(sl, tl, text)
+            if translated is not None:
+                self.memory.put(sl, tl, text, translated)
+        return translated
+
+    def put(self, sl, tl, text, translated):
+        self.memory.put(sl, tl, text, translated)
+        self.disk.put(sl, tl, text, translated)
+
+    def clear(self):
+        self.memory.clear()
+
+    def record_use(self, sl, tl, text):
+        self.disk.record_use(sl, tl, text)
+
+    def frequent(self, limit=50):
+        return self.disk.frequent(limit)
+
+    def bulk_put(self, items, batch_size=10000):
+        # Imports go to disk only; they are promoted to memory on use
+        return self.disk.bulk_put(items, batch_size)
+
+    def entries(self, sl=None, tl=None, limit=None):
+        return self.disk.entries(sl, tl, limit)
+
+    def close(self):
+        self.disk.close()
+
+    def stats(self):
+        stats = self.memory.stats()
+        stats['disk'] = self.disk.stats()
+        return stats
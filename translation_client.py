@@ -0,0 +1,342 @@
+import atexit
+import os
+import threading
+import time
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor
+
+from flow_control import (AdaptiveConcurrencyLimiter, HedgingPolicy, RateLimitedError, RateLimiter,
+                          is_overload)
+from http_pool import RequestHandle
+from resilience import CircuitBreaker, RetryPolicy
+from text_segmentation import chunk_text
+from translation_backends import GoogleGtxBackend, create_backend
+from translation_cache import DiskCache, MemoryCache, TieredCache, make_key
+
+# Longest text sent in one request. Sinhala percent-encodes to about nine
+# URL bytes per character, so this keeps the GET URL well under 16 KB.
+CHUNK_CHARS = 1500
+
+# Persistent cache location; set TRANSLATOR_CACHE_PATH to an empty string to
+# keep the cache in memory only.
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser('~'), '.sinhala_translator', 'cache.sqlite3')
+
+
+class TranslationClient:
+    """Translation client layering caching and flow control over a backend
+
+    By default the backend is Google's gtx endpoint (or a stand-in at
+    base_url) over pooled keep-alive connections.
+    """
+
+    def __init__(self, base_url=None, pool=None, timeout=10, cache=None,
+                 retry=None, breaker=None, limiter=None, rate_limiter=None,
+                 hedging=None, backend=None, chunk_chars=CHUNK_CHARS, chunk_workers=4,
+                 fanout_workers=8):
+        self.backend = backend or GoogleGtxBackend(base_url, pool=pool, timeout=timeout)
+        self.cache = cache
+        # Retries must not stretch a call much past one request timeout
+        self.retry = retry or RetryPolicy(deadline=timeout)
+        self.breaker = breaker or CircuitBreaker()
+        self.limiter = limiter or AdaptiveConcurrencyLimiter()
+        self.rate_limiter = rate_limiter
+        # Optional HedgingPolicy; duplicates slow requests to cut tail latency
+        self.hedging = hedging
+        # Longer texts are split at sentence boundaries and the chunks
+        # translated concurrently on a small bounded pool
+        self.chunk_chars = chunk_chars
+        self._chunk_executor = ThreadPoolExecutor(max_workers=chunk_workers,
+                                                  thread_name_prefix='chunk')
+        # Separate from the chunk pool: a fan-out target may itself be chunked
+        self._fanout_executor = ThreadPoolExecutor(max_workers=fanout_workers,
+                                                   thread_name_prefix='fanout')
+
+        # Requests currently on the wire, keyed like the cache, so identical
+        # concurrent requests share one network call
+        self._inflight = {}
+        self._inflight_lock = threading.Lock()
+        self.coalesced = 0
+
+    def translate(self, text, sl, tl, wait=True, on_segment=None, on_chunk=None, cancel=None):
+        """Translate text from sl to tl and return the translated string
+
+        With wait=False the request is dropped with RateLimitedError instead
+        of waiting for rate-limit budget; use it for low-priority work.
+        on_segment(index, text) is called for each sentence segment as the
+        response streams in (a cache hit arrives as a single segment).
+        Texts longer than chunk_chars are handed to translate_long, which
+        reports progress through on_chunk. Cancelling the optional
+        CancellationToken `cancel` aborts the request and raises CancelledError.
+        """
+        if len(text) > self.chunk_chars:
+            return self.translate_long(text, sl, tl, wait, on_segment, on_chunk, cancel)
+
+        if self.cache is not None:
+            self.cache.record_use(sl, tl, text)
+            cached = self.cache.get(sl, tl, text)
+            if cached is not None:
+                if on_segment is not None:
+                    on_segment(0, cached)
+                return cached
+
+        key = make_key(sl, tl, text)
+        while True:
+            with self._inflight_lock:
+                future = self._inflight.get(key)
+                leader = future is None
+                if leader:
+                    future = Future()
+                    self._inflight[key] = future
+                else:
+                    self.coalesced += 1
+            if leader:
+                break
+            try:
+                return future.result()
+            except CancelledError:
+                # The leader was cancelled, not this caller; take over
+                if cancel is not None:
+                    cancel.check()
+
+        try:
+            translated = self.fetch(text, sl, tl, wait, on_segment, cancel)
+            if self.cache is not None:
+                self.cache.put(sl, tl, text, translated)
+            future.set_result(translated)
+            return translated
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._inflight_lock:
+                del self._inflight[key]
+
+    def translate_long(self, text, sl, tl, wait=True, on_segment=None, on_chunk=None, cancel=None):
+        """Translate a long text as sentence-aligned chunks and join them in order
+
+        Chunks go out concurrently and are cached individually, so editing
+        one paragraph of a long document only re-translates its chunk. The
+        whitespace around each chunk is kept as in the source.
+
+        on_chunk(index, count, text) is called from a worker thread as each
+        chunk finishes, in completion order, so a UI can fill in the document
+        out of order. Without it, on_segment(index, text) receives whole
+        chunks in document order.
+        """
+        chunks = chunk_text(text, self.chunk_chars)
+
+        def translate_chunk(index, chunk):
+            body = chunk.strip()
+            if body:
+                start = chunk.index(body[0])
+                chunk = (chunk[:start] + self.translate(body, sl, tl, wait, cancel=cancel)
+                         + chunk[start + len(body):])
+            if on_chunk is not None:
+                on_chunk(index, len(chunks), chunk)
+            return chunk
+
+        futures = [self._chunk_executor.submit(translate_chunk, index, chunk)
+                   for index, chunk in enumerate(chunks)]
+        parts = []
+        try:
+            for index, future in enumerate(futures):
+                parts.append(future.result())
+                if on_segment is not None and on_chunk is None:
+                    on_segment(index, parts[-1])
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
+        return ''.join(parts)
+
+    def translate_fanout(self, text, sl, targets, on_result=None):
+        """Translate text into several target languages at once
+
+        The targets run concurrently over the shared cache and connection
+        pool, so the total time is about that of the slowest one.
+        on_result(tl, translated, error) is called from a worker thread as
+        each target finishes; exactly one of translated and error is None.
+        Returns a dict of tl -> translation for the targets that succeeded.
+        """
+        def translate_target(tl):
+            try:
+                translated = self.translate(text, sl, tl)
+            except Exception as e:
+                if on_result is not None:
+                    on_result(tl, None, e)
+                return None
+            if on_result is not None:
+                on_result(tl, translated, None)
+            return translated
+
+        futures = {tl: self._fanout_executor.submit(translate_target, tl)
+                   for tl in dict.fromkeys(targets) if tl != sl}
+        results = {}
+        for tl, future in futures.items():
+            translated = future.result()
+            if translated is not None:
+                results[tl] = translated
+        return results
+
+    def translate_batch(self, texts, sl, tl, cancel=None, wait=True):
+        """Translate several texts with one round trip and return results in order
+
+        With wait=False a request raises RateLimitedError instead of waiting
+        for rate-limit budget, for speculative work that can be dropped.
+        """
+        results = [None] * len(texts)
+        missing = []
+        for i, text in enumerate(texts):
+            cached = self.cache.get(sl, tl, text) if self.cache is not None else None
+            if cached is not None:
+                results[i] = cached
+            else:
+                missing.append(i)
+
+        # Texts too long for one request go out as chunks of their own
+        for i in [i for i in missing if len(texts[i]) > self.chunk_chars]:
+            results[i] = self.translate(texts[i], sl, tl, wait=wait, cancel=cancel)
+            missing.remove(i)
+
+        if len(missing) == 1:
+            results[missing[0]] = self.fetch(texts[missing[0]], sl, tl, wait=wait, cancel=cancel)
+        elif missing:
+            fetched = self.fetch_batch([texts[i] for i in missing], sl, tl, cancel, wait)
+            for i, translated in zip(missing, fetched):
+                results[i] = translated
+
+        if self.cache is not None:
+            for i in missing:
+                self.cache.put(sl, tl, texts[i], results[i])
+        return results
+
+    def fetch_batch(self, texts, sl, tl, cancel=None, wait=True):
+        """Pack texts into one request, one per line, and split the response back
+
+        Line breaks inside a text are folded to spaces so the only newlines in
+        the request are the separators. Google keeps line structure, but if
+        the number of lines that come back differs, fall back to one request
+        per text rather than guess at the alignment.
+        """
+        framed = '\n'.join(' '.join(text.split()) for text in texts)
+        lines = self.fetch(framed, sl, tl, wait=wait, cancel=cancel).split('\n')
+        if len(lines) != len(texts):
+            return [self.fetch(text, sl, tl, wait=wait, cancel=cancel) for text in texts]
+        return [line.strip() for line in lines]
+
+    def fetch(self, text, sl, tl, wait=True, on_segment=None, cancel=None):
+        """Translate over the network, bypassing the cache
+
+        Transient failures are retried with backoff; while the circuit
+        breaker is open this raises CircuitOpenError without a request.
+        Each attempt takes rate-limit budget and then waits for a slot from
+        the adaptive concurrency limiter. If an attempt is retried after
+        streaming some segments, on_segment sees the same indexes again.
+        """
+        def attempt():
+            if cancel is not None:
+                cancel.check()
+            if self.rate_limiter is not None:
+                if wait:
+                    self.rate_limiter.acquire(len(text))
+                elif not self.rate_limiter.try_acquire(len(text)):
+                    raise RateLimitedError("Translation rate limit reached")
+            return self.breaker.call(
+                lambda: self.limiter.call(lambda: self._fetch_once(text, sl, tl, on_segment, cancel)))
+
+        return self.retry.call(attempt)
+
+    def _fetch_once(self, text, sl, tl, on_segment=None, cancel=None):
+        if cancel is not None:
+            cancel.check()
+            handle = cancel.handle()
+            try:
+                return self.backend.translate(text, sl, tl, handle, on_segment)
+            except Exception as e:
+                # An aborted socket surfaces as a connection error
+                if cancel.cancelled:
+                    raise CancelledError() from e
+                raise
+            finally:
+                cancel.release(handle)
+
+        # Streamed segments would be delivered twice by a hedge, so streaming
+        # requests are never hedged
+        if self.hedging is None or on_segment is not None:
+            return self.backend.translate(text, sl, tl, on_segment=on_segment)
+        return self.hedging.run(lambda handle: self.backend.translate(text, sl, tl, handle),
+                                lambda: self._admit_hedge(text, sl, tl))
+
+    def _admit_hedge(self, text, sl, tl):
+        """Take a concurrency slot and rate budget for a hedge without waiting"""
+        if not self.limiter.try_acquire():
+            return None
+        if self.rate_limiter is not None and not self.rate_limiter.try_acquire(len(text)):
+            self.limiter.release()
+            return None
+
+        def hedge(handle):
+            start = time.monotonic()
+            try:
+                translated = self.backend.translate(text, sl, tl, handle)
+            except Exception as e:
+                self.limiter.release(overloaded=is_overload(e))
+                raise
+            self.limiter.release(latency=time.monotonic() - start)
+            return translated
+        return hedge
+
+    @property
+    def pool(self):
+        """Connection pool of the backend, if it has one"""
+        return getattr(self.backend, 'pool', None)
+
+    def close(self):
+        self._chunk_executor.shutdown(wait=False)
+        self._fanout_executor.shutdown(wait=False)
+        self.backend.close()
+
+
+_default_client = None
+_default_lock = threading.Lock()
+
+
+def get_client():
+    """Return the process-wide client shared by every frontend"""
+    global _default_client
+    with _default_lock:
+        if _default_client is None:
+            ttl = os.environ.get('TRANSLATOR_CACHE_TTL')
+            cache = MemoryCache(
+                max_bytes=int(os.environ.get('TRANSLATOR_CACHE_BYTES', 8 * 1024 * 1024)),
+                ttl=float(ttl) if ttl else None)
+            cache_path = os.environ.get('TRANSLATOR_CACHE_PATH', DEFAULT_CACHE_PATH)
+            if cache_path:
+                try:
+                    cache = TieredCache(cache, DiskCache(cache_path))
+                    atexit.register(cache.close)
+                except Exception as e:
+                    print(f"Persistent translation cache disabled: {e}")
+            # The gtx endpoint throttles aggressive callers; 0 disables the limit
+            rps = float(os.environ.get('TRANSLATOR_RATE_RPS', 10))
+            cps = float(os.environ.get('TRANSLATOR_RATE_CPS', 10000))
+            rate_limiter = RateLimiter(rps, cps) if rps > 0 and cps > 0 else None
+            # Hedging is opt-in: the fraction of requests that may be duplicated
+            hedge_fraction = float(os.environ.get('TRANSLATOR_HEDGE_FRACTION', 0))
+            hedging = (HedgingPolicy(RequestHandle, max_fraction=hedge_fraction)
+                       if hedge_fraction > 0 else None)
+            backend = create_backend(os.environ.get('TRANSLATOR_BACKEND'),
+                                     os.environ.get('TRANSLATOR_BASE_URL'))
+            _default_client = TranslationClient(backend=backend, cache=cache,
+                                                rate_limiter=rate_limiter, hedging=hedging)
+        return _default_client
+
+
+def translate(text, sl, tl, on_segment=None, on_chunk=None, cancel=None):
+    """Translate text using the shared client"""
+    return get_client().translate(text, sl, tl, on_segment=on_segment, on_chunk=on_chunk,
+                                  cancel=cancel)
+
+
+def translate_fanout(text, sl, targets, on_result=None):
+    """Translate text into several languages at once using the shared client"""
+    return get_client().translate_fanout(text, sl, targets, on_result)
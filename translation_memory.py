@@ -0,0 +1,197 @@
+import random
+import threading
+import unicodedata
+from array import array
+from collections import Counter
+
+NGRAM = 3
+NUM_PERM = 60
+BANDS = 15
+THRESHOLD = 0.6
+# Most candidates verified per lookup, those sharing the most bands first
+MAX_CANDIDATES = 50
+
+_MASK64 = (1 << 64) - 1
+
+
+def normalize_utterance(text):
+    """Casefold, drop punctuation and collapse whitespace
+
+    Recognizer output for one spoken sentence differs mostly in case,
+    punctuation and contractions, none of which should count against a match.
+    """
+    text = unicodedata.normalize('NFC', text).casefold()
+    # Apostrophes join a word ("where's" -> "wheres"); other punctuation splits
+    text = text.replace("'", '').replace('’', '')
+    text = ''.join(' ' if unicodedata.category(char)[0] in 'PS' else char for char in text)
+    return ' '.join(text.split())
+
+
+def shingles(text, n=NGRAM):
+    """Character n-grams of normalized text, padded with a space on both ends"""
+    text = ' ' + text + ' '
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+
+def jaccard(a, b):
+    common = len(a & b)
+    return common / (len(a) + len(b) - common)
+
+
+class TranslationMemory:
+    """Fuzzy translation memory over past (source, translated) pairs
+
+    Each source is indexed by a MinHash signature of its character trigrams,
+    split into LSH bands, so a lookup only scores the few stored sources that
+    share a band with the query, whatever the size of the memory. Candidates
+    are verified with their exact trigram Jaccard similarity and the best one
+    at or above `threshold` wins; at most `max_candidates` are verified, most
+    shared bands first, so a small vocabulary that piles sources into the
+    same buckets cannot make a lookup slow. The signatures use the salted
+    built-in string hash, so the index lives in memory and is rebuilt each
+    session.
+    """
+
+    def __init__(self, threshold=THRESHOLD, num_perm=NUM_PERM, bands=BANDS,
+                 max_candidates=MAX_CANDIDATES):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.threshold = threshold
+        self.max_candidates = max_candidates
+        self.bands = bands
+        self.rows = num_perm // bands
+        # XOR with a random mask permutes the hash space cheaply
+        rng = random.Random(num_perm)
+        self._masks = [rng.getrandbits(64) for _ in range(num_perm)]
+
+        self._entries = []   # id -> [sl, tl, normalized, source, translated, gram ids]
+        self._gram_ids = {}  # trigram -> small int, so entries store compact arrays
+        self._exact = {}     # (sl, tl, normalized) -> id
+        self._buckets = {}   # band key -> id, or list of ids once shared
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _signature(self, grams):
+        hashes = [hash(gram) & _MASK64 for gram in grams]
+        return [min([h ^ mask for h in hashes]) for mask in self._masks]
+
+    def _band_keys(self, sl, tl, grams):
+        signature = self._signature(grams)
+        rows = self.rows
+        return [hash((band, sl, tl, *signature[band * rows:(band + 1) * rows]))
+                for band in range(self.bands)]
+
+    def add(self, sl, tl, source, translated):
+        """Remember a translation; a repeated source keeps the newest translation"""
+        normalized = normalize_utterance(source)
+        if not normalized or not translated:
+            return
+        with self._lock:
+            self._insert(sl, tl, normalized, source, translated)
+
+    def extend(self, items):
+        """Add many (sl, tl, source, translated) tuples, e.g. rows of a cache
+
+        The lock is taken per item, so lookups are served while a large
+        memory is still loading in the background.
+        """
+        for sl, tl, source, translated in items:
+            normalized = normalize_utterance(source)
+            if normalized and translated:
+                with self._lock:
+                    self._insert(sl, tl, normalized, source, translated)
+
+    def _insert(self, sl, tl, normalized, source, translated):
+        key = (sl, tl, normalized)
+        entry_id = self._exact.get(key)
+        if entry_id is not None:
+            entry = self._entries[entry_id]
+            entry[3] = source
+            entry[4] = translated
+            return
+
+        grams = shingles(normalized)
+        entry_id = len(self._entries)
+        gram_ids = self._gram_ids
+        ids = array('I', [gram_ids.setdefault(gram, len(gram_ids)) for gram in grams])
+        self._entries.append([sl, tl, normalized, source, translated, ids])
+        self._exact[key] = entry_id
+        buckets = self._buckets
+        for band_key in self._band_keys(sl, tl, grams):
+            bucket = buckets.get(band_key)
+            if bucket is None:
+                buckets[band_key] = entry_id
+            elif isinstance(bucket, list):
+                bucket.append(entry_id)
+            else:
+                buckets[band_key] = [bucket, entry_id]
+
+    def lookup(self, sl, tl, text):
+        """Return (translated, score, source) of the closest stored source, or None"""
+        normalized = normalize_utterance(text)
+        if not normalized:
+            return None
+        with self._lock:
+            match = self._lookup(sl, tl, normalized)
+            if match is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return match
+
+    def _lookup(self, sl, tl, normalized):
+        entry_id = self._exact.get((sl, tl, normalized))
+        if entry_id is not None:
+            entry = self._entries[entry_id]
+            return entry[4], 1.0, entry[3]
+
+        grams = shingles(normalized)
+        shared = Counter()
+        for band_key in self._band_keys(sl, tl, grams):
+            bucket = self._buckets.get(band_key)
+            if bucket is None:
+                continue
+            if isinstance(bucket, list):
+                shared.update(bucket)
+            else:
+                shared[bucket] += 1
+        if len(shared) > self.max_candidates:
+            candidates = [entry_id for entry_id, _ in shared.most_common(self.max_candidates)]
+        else:
+            candidates = shared
+
+        # Trigrams never stored cannot be shared, but still count in the union
+        ids = {self._gram_ids.get(gram, -1 - i) for i, gram in enumerate(grams)}
+
+        # Jaccard can only reach the threshold between sets of similar size
+        size = len(grams)
+        smallest = size * self.threshold
+        largest = size / self.threshold
+        best, best_score = None, self.threshold
+        for entry_id in candidates:
+            entry = self._entries[entry_id]
+            if not smallest <= len(entry[5]) <= largest or entry[0] != sl or entry[1] != tl:
+                continue
+            common = len(ids.intersection(entry[5]))
+            score = common / (size + len(entry[5]) - common)
+            if score >= best_score:
+                best, best_score = entry, score
+        if best is None:
+            return None
+        return best[4], best_score, best[3]
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'buckets': len(self._buckets),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
@@ -0,0 +1,179 @@
+HAL = '්'   # al-lakuna: a consonant without its inherent vowel
+ZWJ = '‍'   # joins ්‍ර (rakaransaya) and ්‍ය (yansaya)
+
+# Singlish consonants; capitals and doubled letters pick the rarer forms
+SINGLISH_CONSONANTS = {
+    'k': 'ක', 'kh': 'ඛ', 'K': 'ඛ', 'q': 'ක',
+    'g': 'ග', 'gh': 'ඝ', 'G': 'ඝ', 'nng': 'ඟ', 'gn': 'ඥ',
+    'c': 'ච', 'ch': 'ච', 'chh': 'ඡ', 'j': 'ජ', 'jh': 'ඣ',
+    't': 'ට', 'T': 'ඨ', 'D': 'ඩ', 'nnd': 'ඬ', 'N': 'ණ',
+    'th': 'ත', 'Th': 'ථ', 'd': 'ද', 'dh': 'ද', 'Dh': 'ධ', 'nndh': 'ඳ', 'n': 'න',
+    'p': 'ප', 'ph': 'ඵ', 'P': 'ඵ', 'b': 'බ', 'bh': 'භ', 'B': 'භ', 'mmb': 'ඹ', 'm': 'ම',
+    'y': 'ය', 'r': 'ර', 'l': 'ල', 'L': 'ළ', 'v': 'ව', 'w': 'ව',
+    'sh': 'ශ', 'Sh': 'ෂ', 'S': 'ෂ', 's': 'ස', 'z': 'ස', 'h': 'හ', 'f': 'ෆ',
+}
+
+# Singlish vowels: (independent letter, sign after a consonant)
+SINGLISH_VOWELS = {
+    'a': ('අ', ''), 'aa': ('ආ', 'ා'),
+    'A': ('ඇ', 'ැ'), 'ae': ('ඇ', 'ැ'), 'AA': ('ඈ', 'ෑ'), 'aae': ('ඈ', 'ෑ'),
+    'i': ('ඉ', 'ි'), 'ii': ('ඊ', 'ී'),
+    'u': ('උ', 'ු'), 'uu': ('ඌ', 'ූ'),
+    'e': ('එ', 'ෙ'), 'ee': ('ඒ', 'ේ'), 'ai': ('ඓ', 'ෛ'),
+    'o': ('ඔ', 'ො'), 'oo': ('ඕ', 'ෝ'), 'au': ('ඖ', 'ෞ'),
+}
+
+# Signs that close a consonant with its inherent vowel
+SINGLISH_SIGNS = {
+    'x': 'ං',
+}
+
+# Consonants written as a conjunct (්‍ර, ්‍ය) after another consonant
+CONJUNCT_CONSONANTS = ('ර', 'ය')
+
+
+class Trie:
+    """Prefix tree for longest-match lookups of rule keys"""
+
+    def __init__(self, rules):
+        self.root = {}
+        for key, value in rules.items():
+            node = self.root
+            for char in key:
+                node = node.setdefault(char, {})
+            # None marks the end of a key
+            node[None] = value
+
+    def longest(self, text, start):
+        """Return (value, end) of the longest key at text[start:], or None"""
+        node = self.root
+        match = None
+        for i in range(start, len(text)):
+            node = node.get(text[i])
+            if node is None:
+                break
+            if None in node:
+                match = node[None], i + 1
+        return match
+
+
+class Transliterator:
+    """Converts phonetic Singlish to Sinhala script with longest-match rules"""
+
+    def __init__(self, consonants=SINGLISH_CONSONANTS, vowels=SINGLISH_VOWELS, signs=SINGLISH_SIGNS):
+        rules = {}
+        rules.update({key: ('consonant', letter) for key, letter in consonants.items()})
+        rules.update({key: ('vowel', forms) for key, forms in vowels.items()})
+        rules.update({key: ('sign', sign) for key, sign in signs.items()})
+        # A capital at the start of a sentence means the same as the lower-case key
+        for key, value in list(rules.items()):
+            capitalized = key[0].upper() + key[1:]
+            if capitalized not in rules:
+                rules[capitalized] = value
+        self.trie = Trie(rules)
+
+    def transliterate(self, text):
+        """Return text with every run of Singlish converted; other characters are kept"""
+        out = []
+        consonant = None  # the last consonant, while it still lacks a vowel
+        i = 0
+        while i < len(text):
+            match = self.trie.longest(text, i)
+            if match is None:
+                if consonant:
+                    out.append(HAL)
+                    consonant = None
+                out.append(text[i])
+                i += 1
+                continue
+
+            (kind, value), i = match
+            if kind == 'consonant':
+                if consonant:
+                    out.append(HAL + ZWJ if value in CONJUNCT_CONSONANTS else HAL)
+                out.append(value)
+                consonant = value
+            elif kind == 'vowel':
+                independent, sign = value
+                out.append(sign if consonant else independent)
+                consonant = None
+            else:
+                out.append(value)
+                consonant = None
+        if consonant:
+            out.append(HAL)
+        return ''.join(out)
+
+
+_singlish = None
+
+
+def singlish():
+    global _singlish
+    if _singlish is None:
+        _singlish = Transliterator()
+    return _singlish
+
+
+def transliterate(text):
+    """Convert Singlish text to Sinhala script"""
+    return singlish().transliterate(text)
+
+
+class LiveTransliteration:
+    """Converts Singlish to Sinhala while it is typed into a Tk Text widget
+
+    Only the Latin letters of the word being typed are remembered; each
+    keystroke re-converts that word and replaces its Sinhala rendering in
+    place, so the cost of a keystroke depends on the word, never on the
+    length of the buffer. Any other key, a click or moving the cursor ends
+    the word. The widget then holds plain Sinhala text for the usual
+    translation path. Create it after the widget's own key bindings.
+    """
+
+    START_MARK = 'singlish_start'
+
+    def __init__(self, widget, transliterator=None, enabled=True):
+        self.widget = widget
+        self.transliterator = transliterator or singlish()
+        self.enabled = enabled
+        self.roman = ''
+        self.end = None
+
+        widget.bind('<KeyPress>', self.on_key, add='+')
+        widget.bind('<Button-1>', self.reset, add='+')
+
+    def reset(self, event=None):
+        self.roman = ''
+        self.end = None
+
+    def on_key(self, event):
+        if not self.enabled:
+            return None
+        char = event.char
+        typing_word = self.roman and self.widget.index('insert') == self.end
+
+        if char and char.isascii() and char.isalpha():
+            if not typing_word:
+                # Typing over a selection replaces it, as usual
+                if self.widget.tag_ranges('sel'):
+                    self.widget.delete('sel.first', 'sel.last')
+                self.roman = ''
+                self.widget.mark_set(self.START_MARK, 'insert')
+                self.widget.mark_gravity(self.START_MARK, 'left')
+            self.roman += char
+            self.render()
+            return 'break'
+        if event.keysym == 'BackSpace' and typing_word:
+            self.roman = self.roman[:-1]
+            self.render()
+            return 'break'
+        self.reset()
+        return None
+
+    def render(self):
+        widget = self.widget
+        widget.delete(self.START_MARK, 'insert')
+        widget.insert('insert', self.transliterator.transliterate(self.roman))
+        widget.see('insert')
+        self.end = widget.index('insert') if self.roman else None
@@ -3,9 +3,11 @@ from tkinter import ttk, scrolledtext, messagebox
 import threading
 import queue
 import time
-import urllib.request
-import urllib.parse
-import json
+import itertools
+
+from translation_client import get_client, translate
+from translation_batcher import MicroBatcher
+from translation_memory import TranslationMemory
 
 # Try to import speech recognition
 try:
@@ -16,6 +18,9 @@ except ImportError:
     print("Speech Recognition not installed. Voice features will be disabled.")
     print("To enable voice features, run: py -m pip install SpeechRecognition pyaudio")
 
+# Stored translations (including imported TMX files) indexed per language pair
+MEMORY_LOAD_LIMIT = 50000
+
 class VoiceTranslator:
     def __init__(self, root):
         self.root = root
@@ -35,10 +40,19 @@ class VoiceTranslator:
         self.input_lang = 'en'
         self.output_lang = 'si'
 
-        # Translation history
+        # Translation history, also kept as a fuzzy translation memory so a
+        # phrase recognized slightly differently is answered without a request
         self.history = []
+        self.memory = TranslationMemory()
+        self.memory_pairs = set()
+        # Tags naming each provisional fuzzy match until its real translation replaces it
+        self.provisional_tags = (f"provisional{n}" for n in itertools.count())
+
+        # Bursts of recognized phrases share one translation round trip
+        self.batcher = MicroBatcher(window=0.02)
 
         self.setup_ui()
+        self.load_memory()
 
         # Adjust for ambient noise if speech is available
         if SPEECH_AVAILABLE:
@@ -184,6 +198,7 @@ class VoiceTranslator:
         self.conversation_display.tag_config("translated", foreground="green", font=('Segoe UI', 12, 'bold'))
         self.conversation_display.tag_config("error", foreground="red")
         self.conversation_display.tag_config("system", foreground="purple", font=('Segoe UI', 9, 'italic'))
+        self.conversation_display.tag_config("provisional", foreground="gray", font=('Segoe UI', 12, 'italic'))
 
         # History tab
         history_tab = ttk.Frame(self.notebook)
@@ -216,6 +231,23 @@ class VoiceTranslator:
 
         self.input_lang = self.lang_dict.get(input_selection, 'en')
         self.output_lang = self.lang_dict.get(output_selection, 'si')
+        self.load_memory()
+
+    def load_memory(self):
+        """Index stored translations of the current language pair in the background"""
+        pair = (self.input_lang, self.output_lang)
+        cache = get_client().cache
+        if cache is None or pair in self.memory_pairs:
+            return
+        self.memory_pairs.add(pair)
+
+        def load():
+            try:
+                self.memory.extend(cache.entries(*pair, limit=MEMORY_LOAD_LIMIT))
+            except Exception as e:
+                print(f"Translation memory load error: {e}")
+
+        threading.Thread(target=load, daemon=True).start()
 
     def swap_languages(self):
         input_val = self.input_lang_combo.get()
@@ -320,19 +352,38 @@ class VoiceTranslator:
             print(f"Recognition error: {e}")
 
     def process_text_queue(self):
-        """Process text queue for translation"""
+        """Process text queue for translation, batching bursts into one request"""
         while True:
             try:
-                if not self.text_queue.empty():
-                    text = self.text_queue.get()
-                    self.translate_and_display(text)
-                else:
-                    time.sleep(0.1)
+                pending = [self.text_queue.get()]
+                while True:
+                    try:
+                        pending.append(self.text_queue.get_nowait())
+                    except queue.Empty:
+                        break
+
+                # Submit the whole burst before waiting so it shares a batch,
+                # then display in the order the phrases were recognized.
+                # A phrase seen before comes from the memory; one merely close
+                # to an earlier phrase is shown from it while it is translated.
+                work = []
+                for text in pending:
+                    match = self.memory.lookup(self.input_lang, self.output_lang, text)
+                    exact = match is not None and match[1] == 1.0
+                    future = None if exact else self.batcher.submit(text, self.input_lang, self.output_lang)
+                    work.append((text, future, match))
+                for text, future, match in work:
+                    self.translate_and_display(text, future, match)
             except Exception as e:
                 print(f"Text processing error: {e}")
 
-    def translate_and_display(self, text):
-        """Translate text and display in conversation"""
+    def translate_and_display(self, text, future=None, match=None):
+        """Translate text and display in conversation
+
+        match is a (translated, score, source) translation memory hit. An
+        exact hit is shown instead of translating; a fuzzy one is shown as a
+        provisional line that the real translation replaces when it arrives.
+        """
         timestamp = time.strftime("%H:%M:%S")
 
         # Display original text
@@ -348,26 +399,42 @@ class VoiceTranslator:
             text="Translating... / පරිවර්තනය කරමින්..."))
 
         # Translate
+        provisional = None
         try:
-            translated = self.translate_text(text)
-
-            if translated:
+            if match and match[1] == 1.0:
+                translated, score, _ = match
+                label = f"🌐 {self.output_lang.upper()} (TM): "
+            else:
+                if match:
+                    provisional = next(self.provisional_tags)
+                    self.root.after(0, self.show_provisional, provisional, *match)
+                translated = future.result() if future else self.translate_text(text)
+                score = None
+                label = f"🌐 {self.output_lang.upper()}: "
+
+            if translated and provisional:
+                self.root.after(0, self.replace_provisional, provisional, label, translated)
+            elif translated:
                 # Display translated text
                 self.root.after(0, lambda: self.conversation_display.insert(
-                    tk.END, f"🌐 {self.output_lang.upper()}: ", "translated"))
+                    tk.END, label, "translated"))
                 self.root.after(0, lambda: self.conversation_display.insert(
                     tk.END, f"{translated}\n", "translated"))
                 self.root.after(0, lambda: self.conversation_display.insert(
                     tk.END, "-" * 60 + "\n", "system"))
 
+            if translated:
                 # Add to history
                 self.history.append({
                     'time': timestamp,
                     'original': text,
                     'translated': translated,
                     'from': self.input_lang,
-                    'to': self.output_lang
+                    'to': self.output_lang,
+                    'tm': score
                 })
+                if score is None:
+                    self.memory.add(self.input_lang, self.output_lang, text, translated)
 
                 # Update history display
                 self.update_history_display()
@@ -380,37 +447,36 @@ class VoiceTranslator:
             self.root.after(0, lambda: self.conversation_display.see(tk.END))
 
         except Exception as e:
-            self.root.after(0, lambda: self.conversation_display.insert(
-                tk.END, f"❌ Translation error: {e}\n", "error"))
+            error = str(e)
+            if provisional:
+                # The near match must not outlive the failed translation
+                self.root.after(0, self.replace_provisional, provisional,
+                                "❌ Translation error: ", error, "error")
+            else:
+                self.root.after(0, lambda: self.conversation_display.insert(
+                    tk.END, f"❌ Translation error: {error}\n", "error"))
+
+    def show_provisional(self, tag, translated, score, source):
+        """Show a fuzzy memory match until the real translation replaces it"""
+        self.conversation_display.insert(
+            tk.END, f"🌐 {self.output_lang.upper()} (TM {score:.0%}, \"{source}\"): {translated}\n",
+            ("provisional", tag))
+        self.conversation_display.insert(tk.END, "-" * 60 + "\n", "system")
+        self.conversation_display.see(tk.END)
+
+    def replace_provisional(self, tag, label, translated, style="translated"):
+        """Swap a provisional line for the real translation or an error; a cleared one stays gone"""
+        ranges = self.conversation_display.tag_ranges(tag)
+        if ranges:
+            start, end = ranges[0], ranges[-1]
+            self.conversation_display.delete(start, end)
+            self.conversation_display.insert(start, f"{label}{translated}\n", style)
+        self.conversation_display.tag_delete(tag)
 
     def translate_text(self, text):
         """Translate text using Google Translate API"""
         try:
-            base_url = "https://translate.googleapis.com/translate_a/single"
-            params = {
-                'client': 'gtx',
-                'sl': self.input_lang,
-                'tl': self.output_lang,
-                'dt': 't',
-                'q': text
-            }
-
-            url = base_url + '?' + urllib.parse.urlencode(params)
-            headers = {'User-Agent': 'Mozilla/5.0'}
-
-            request = urllib.request.Request(url, headers=headers)
-            response = urllib.request.urlopen(request, timeout=10)
-            result = json.loads(response.read().decode('utf-8'))
-
-            # Extract translated text
-            translated_text = ''
-            if result and len(result) > 0 and result[0]:
-                for sentence in result[0]:
-                    if sentence[0]:
-                        translated_text += sentence[0]
-
-            return translated_text
-
+            return translate(text, self.input_lang, self.output_lang)
         except Exception as e:
             print(f"Translation error: {e}")
             return None
@@ -443,7 +509,8 @@ class VoiceTranslator:
         for item in self.history[-20:]:  # Show last 20 translations
             self.history_display.insert(tk.END, f"[{item['time']}]\n", "timestamp")
             self.history_display.insert(tk.END, f"{item['from']}: {item['original']}\n", "original")
-            self.history_display.insert(tk.END, f"{item['to']}: {item['translated']}\n", "translated")
+            marker = f" (TM {item['tm']:.0%})" if item.get('tm') is not None else ""
+            self.history_display.insert(tk.END, f"{item['to']}{marker}: {item['translated']}\n", "translated")
             self.history_display.insert(tk.END, "-" * 40 + "\n", "system")
 
 def main():